@@ -1,46 +1,96 @@
-from pocketflow import Node, Flow, BatchNode
+from pocketflow import Node, Flow
+import functools
+import io
 import os
+import re
 import yaml  # Add YAML support
 import logging
-from datetime import datetime
-from typing import List, Dict, Any, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 
 # Import utility functions
 from .utils.call_llm import call_llm
+from .utils.llm_cache import cached_llm_call
 from .utils.read_file import read_file
 from .utils.delete_file import delete_file
-from .utils.replace_file import replace_file
+from .utils.replace_file import replace_file_batch
 from .utils.search_ops import grep_search
 from .utils.dir_ops import list_dir
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(), logging.FileHandler("coding_agent.log")],
-)
-logging.getLogger("httpx").setLevel(logging.WARNING)
+# Logging is configured by the entry point (see main.py)
 logger = logging.getLogger("coding_agent")
 
+# Use the libyaml-backed loader when PyYAML was built with it
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Fenced blocks in LLM responses, in order of preference: ```yaml, ```yml, then any ```
+_YAML_BLOCK_PATTERNS = tuple(re.compile(rf"```{tag}(.*?)(?:```|\Z)", re.DOTALL) for tag in ("yaml", "yml", ""))
+
+
+def _extract_yaml(response: str) -> Optional[str]:
+    """Return the contents of the first YAML code block in a response, or None if there is none."""
+    for pattern in _YAML_BLOCK_PATTERNS:
+        match = pattern.search(response)
+        if match:
+            return match.group(1).strip()
+    return None
+
+
+def _last_action(shared: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the most recent history entry, or None if there is no history yet."""
+    history = shared.get("history")
+    return history[-1] if history else None
+
+
+def _resolve(shared: Dict[str, Any], path: str) -> str:
+    """Resolve a path against the shared working directory, if one is set."""
+    working_dir = shared.get("working_dir")
+    return os.path.join(working_dir, path) if working_dir else path
+
+
+def _last_touched_file(shared: Dict[str, Any]) -> Optional[str]:
+    """Return the resolved path of the file most recently read or edited, if any."""
+    for action in reversed(shared.get("history") or []):
+        if action.get("tool") in ("read_file", "edit_file"):
+            target_file = action.get("params", {}).get("target_file")
+            if target_file:
+                return _resolve(shared, target_file)
+    return None
+
+
+# Background worker that warms the read_file cache while the LLM is deciding
+_prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+
+
+def _split_tree_lines(tree_visualization: str) -> List[str]:
+    """Split a list_dir tree into its non-blank lines."""
+    return [line for line in tree_visualization.replace("\r\n", "\n").strip().split("\n") if line.strip()]
+
 
 def format_history_summary(history: List[Dict[str, Any]]) -> str:
     if not history:
         return "No previous actions."
 
-    history_str = "\n"
+    buf = io.StringIO()
+    buf.write("\n")
 
     for i, action in enumerate(history):
+        # Add separator between actions
+        if i:
+            buf.write("\n")
+
         # Header for all entries - removed timestamp
-        history_str += f"Action {i+1}:\n"
-        history_str += f"- Tool: {action['tool']}\n"
-        history_str += f"- Reason: {action['reason']}\n"
+        buf.write(f"Action {i+1}:\n")
+        buf.write(f"- Tool: {action['tool']}\n")
+        buf.write(f"- Reason: {action['reason']}\n")
 
         # Add parameters
         params = action.get("params", {})
         if params:
-            history_str += "- Parameters:\n"
+            buf.write("- Parameters:\n")
             for k, v in params.items():
-                history_str += f"  - {k}: {v}\n"
+                buf.write(f"  - {k}: {v}\n")
 
         # Add detailed result information
         result = action.get("result")
@@ -48,166 +98,183 @@ def format_history_summary(history: List[Dict[str, Any]]) -> str:
             if isinstance(result, dict):
                 success = result.get("success", False)
                 res_status = "Success" if success else "Failed"
-                history_str += f"- Result: {res_status}\n"
+                buf.write(f"- Result: {res_status}\n")
 
                 # Add tool-specific details
                 if action["tool"] == "read_file" and success:
                     content = result.get("content", "")
-                    history_str += f"- Content:\n{content}\n"
+                    buf.write("- Content:\n")
+                    buf.write(str(content))
+                    buf.write("\n")
                 elif action["tool"] == "grep_search" and success:
                     matches = result.get("matches", [])
-                    history_str += f"- Matches: {len(matches)}\n"
-                    for j, match in enumerate(matches):
-                        file_line = f"{match.get('file')}:{match.get('line')}"
-                        history_str += f"  {j+1}. {file_line}: " f"{match.get('content')}\n"
+                    buf.write(f"- Matches: {len(matches)}\n")
+                    # Format every match first and write them in one call. Keep .get():
+                    # grep_search entries carry "line_number", so "line" may be absent
+                    buf.write(
+                        "".join(
+                            [
+                                f"  {j}. {match.get('file')}:{match.get('line')}: {match.get('content')}\n"
+                                for j, match in enumerate(matches, 1)
+                            ]
+                        )
+                    )
                 elif action["tool"] == "edit_file" and success:
                     operations = result.get("operations", 0)
-                    history_str += f"- Operations: {operations}\n"
+                    buf.write(f"- Operations: {operations}\n")
 
                     reasoning = result.get("reasoning", "")
                     if reasoning:
-                        history_str += f"- Reasoning: {reasoning}\n"
+                        buf.write(f"- Reasoning: {reasoning}\n")
                 elif action["tool"] == "list_dir" and success:
                     tree_visualization = result.get("tree_visualization", "")
-                    history_str += "- Directory structure:\n"
+                    buf.write("- Directory structure:\n")
 
                     if tree_visualization and isinstance(tree_visualization, str):
-                        clean_tree = tree_visualization.replace("\r\n", "\n").strip()
+                        # ListDirAction stores the split lines; older entries fall back to splitting here
+                        tree_lines = result.get("tree_lines")
+                        if tree_lines is None:
+                            tree_lines = _split_tree_lines(tree_visualization)
 
-                        if clean_tree:
-                            for line in clean_tree.split("\n"):
-                                if line.strip():
-                                    history_str += f"  {line}\n"
+                        if tree_lines:
+                            buf.write("".join([f"  {line}\n" for line in tree_lines]))
                         else:
-                            history_str += "  (No tree structure data)\n"
+                            buf.write("  (No tree structure data)\n")
                     else:
-                        history_str += "  (Empty or inaccessible directory)\n"
+                        buf.write("  (Empty or inaccessible directory)\n")
                         logger.debug("Tree visualization missing or invalid")
             else:
-                history_str += f"- Result: {result}\n"
+                buf.write(f"- Result: {result}\n")
 
-        # Add separator between actions
-        history_str += "\n" if i < len(history) - 1 else ""
-
-    return history_str
+    return buf.getvalue()
 
 
 #############################################
 # Main Decision Agent Node
 #############################################
+_MAIN_DECISION_PROMPT = """You are a coding assistant that helps modify and navigate code. \
+Given the following request, decide which tool to use from the available options.
+
+User request: {user_query}
+
+Here are the actions you performed:
+{history_str}
+
+Available tools:
+1. read_file: Read content from a file
+   - Parameters: target_file (path)
+   - Example:
+     tool: read_file
+     reason: I need to read the main.py file
+     params:
+       target_file: main.py
+
+2. edit_file: Make changes to a file
+   - Parameters: target_file (path), instructions, code_edit
+   - Code_edit_instructions:
+       - Use "// ... existing code ..." for unchanged code
+       - Include sufficient context around changes
+       - Minimize repeating unchanged code
+   - Example:
+     tool: edit_file
+     reason: Add error handling to file reading
+     params:
+       target_file: utils/read_file.py
+       instructions: Add try-except block
+       code_edit: |
+            // ... existing file reading code ...
+            function newEdit() {{
+                // new code here
+            }}
+            // ... existing file reading code ...
+
+3. delete_file: Remove a file
+   - Parameters: target_file (path)
+   - Example:
+     tool: delete_file
+     reason: Remove temporary file
+     params:
+       target_file: temp.txt
+
+4. grep_search: Search for patterns in files
+   - Parameters: query, case_sensitive (optional)
+   - Example:
+     tool: grep_search
+     reason: Find all 'logger' in Python files
+     params:
+       query: logger
+       include_pattern: "*.py"
+       case_sensitive: false
+
+5. list_dir: List contents of a directory
+   - Parameters: relative_workspace_path
+   - Example:
+     tool: list_dir
+     reason: See files in utils directory
+     params:
+       relative_workspace_path: utils
+   - Result: Returns directory tree
+
+6. finish: End the process
+   - No parameters required
+   - Example:
+     tool: finish
+     reason: Completed task
+     params: {{}}
+
+Respond with a YAML object containing:
+```yaml
+tool: one of: read_file, edit_file, delete_file, grep_search, list_dir, finish
+reason: |
+  detailed explanation of why you chose this tool
+params:
+  # parameters specific to the chosen tool
+```
+
+If you believe no more actions are needed, use "finish" as the tool."""
+
+
 class MainDecisionAgent(Node):
-    def prep(self, shared: Dict[str, Any]) -> Tuple[str, List[Dict[str, Any]]]:
+    def prep(self, shared: Dict[str, Any]) -> Tuple[str, List[Dict[str, Any]], Optional[str]]:
         # Get user query and history
         user_query = shared.get("user_query", "")
         history = shared.get("history", [])
 
-        return user_query, history
+        # The next action usually reads the file that was last read or edited
+        predicted_file = _last_touched_file(shared)
+
+        return user_query, history, predicted_file
 
-    def exec(self, inputs: Tuple[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
-        user_query, history = inputs
+    def exec(self, inputs: Tuple[str, List[Dict[str, Any]], Optional[str]]) -> Dict[str, Any]:
+        user_query, history, predicted_file = inputs
         logger.info(f"MainDecisionAgent: Analyzing user query: {user_query}")
 
         # Format history using the utility function with 'basic' detail level
         history_str = format_history_summary(history)
 
         # Create prompt for the LLM using YAML instead of JSON
-        prompt = (
-            "You are a coding assistant that helps modify and navigate code. "
-            "Given the following request, decide which tool to use from the "
-            "available options.\n\n"
-            f"User request: {user_query}\n\n"
-            f"Here are the actions you performed:\n{history_str}\n\n"
-            "Available tools:\n"
-            "1. read_file: Read content from a file\n"
-            "   - Parameters: target_file (path)\n"
-            "   - Example:\n"
-            "     tool: read_file\n"
-            "     reason: I need to read the main.py file\n"
-            "     params:\n"
-            "       target_file: main.py\n\n"
-            "2. edit_file: Make changes to a file\n"
-            "   - Parameters: target_file (path), instructions, code_edit\n"
-            "   - Code_edit_instructions:\n"
-            '       - Use "// ... existing code ..." for unchanged code\n'
-            "       - Include sufficient context around changes\n"
-            "       - Minimize repeating unchanged code\n"
-            "   - Example:\n"
-            "     tool: edit_file\n"
-            "     reason: Add error handling to file reading\n"
-            "     params:\n"
-            "       target_file: utils/read_file.py\n"
-            "       instructions: Add try-except block\n"
-            "       code_edit: |\n"
-            "            // ... existing file reading code ...\n"
-            "            function newEdit() {{\n"
-            "                // new code here\n"
-            "            }}\n"
-            "            // ... existing file reading code ...\n\n"
-            "3. delete_file: Remove a file\n"
-            "   - Parameters: target_file (path)\n"
-            "   - Example:\n"
-            "     tool: delete_file\n"
-            "     reason: Remove temporary file\n"
-            "     params:\n"
-            "       target_file: temp.txt\n\n"
-            "4. grep_search: Search for patterns in files\n"
-            "   - Parameters: query, case_sensitive (optional)\n"
-            "   - Example:\n"
-            "     tool: grep_search\n"
-            "     reason: Find all 'logger' in Python files\n"
-            "     params:\n"
-            "       query: logger\n"
-            '       include_pattern: "*.py"\n'
-            "       case_sensitive: false\n\n"
-            "5. list_dir: List contents of a directory\n"
-            "   - Parameters: relative_workspace_path\n"
-            "   - Example:\n"
-            "     tool: list_dir\n"
-            "     reason: See files in utils directory\n"
-            "     params:\n"
-            "       relative_workspace_path: utils\n"
-            "   - Result: Returns directory tree\n\n"
-            "6. finish: End the process\n"
-            "   - No parameters required\n"
-            "   - Example:\n"
-            "     tool: finish\n"
-            "     reason: Completed task\n"
-            "     params: {{}}\n\n"
-            "Respond with a YAML object containing:\n"
-            "```yaml\n"
-            "tool: one of: read_file, edit_file, delete_file, grep_search, list_dir, finish\n"
-            "reason: |\n"
-            "  detailed explanation of why you chose this tool\n"
-            "params:\n"
-            "  # parameters specific to the chosen tool\n"
-            "```\n\n"
-            'If you believe no more actions are needed, use "finish" as the tool.'
-        )
+        prompt = _MAIN_DECISION_PROMPT.format(user_query=user_query, history_str=history_str)
 
-        # Call LLM to decide action
-        response = call_llm(prompt)
+        # Read the predicted file in the background so the read overlaps the LLM call;
+        # read_file caches the lines, so a correct guess makes the next read free
+        prefetch = _prefetch_pool.submit(read_file, predicted_file) if predicted_file else None
+
+        # Call LLM to decide action, reusing the response for a repeated prompt
+        try:
+            response = cached_llm_call(prompt, call_llm)
+        finally:
+            # Finish the prefetch before returning so the cache is never used from two threads
+            if prefetch is not None:
+                prefetch.result()
 
         # Look for YAML structure in the response
-        yaml_content = ""
-        if "```yaml" in response:
-            yaml_blocks = response.split("```yaml")
-            if len(yaml_blocks) > 1:
-                yaml_content = yaml_blocks[1].split("```")[0].strip()
-        elif "```yml" in response:
-            yaml_blocks = response.split("```yml")
-            if len(yaml_blocks) > 1:
-                yaml_content = yaml_blocks[1].split("```")[0].strip()
-        elif "```" in response:
-            # Try to extract from generic code block
-            yaml_blocks = response.split("```")
-            if len(yaml_blocks) > 1:
-                yaml_content = yaml_blocks[1].strip()
-        else:
+        yaml_content = _extract_yaml(response)
+        if yaml_content is None:
             # If no code blocks, try to use the entire response
             yaml_content = response.strip()
 
         if yaml_content:
-            decision = yaml.safe_load(yaml_content)
+            decision = yaml.load(yaml_content, Loader=_YamlLoader)
 
             # Validate the required fields
             assert "tool" in decision, "Tool name is missing"
@@ -237,7 +304,7 @@ class MainDecisionAgent(Node):
                 "reason": exec_res["reason"],
                 "params": exec_res.get("params", {}),
                 "result": None,  # Will be filled in by action nodes
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": time.time_ns(),  # Epoch nanoseconds
             }
         )
 
@@ -251,19 +318,17 @@ class MainDecisionAgent(Node):
 class ReadFileAction(Node):
     def prep(self, shared: Dict[str, Any]) -> str:
         # Get parameters from the last history entry
-        history = shared.get("history", [])
-        if not history:
+        last_action = _last_action(shared)
+        if last_action is None:
             raise ValueError("No history found")
 
-        last_action = history[-1]
         file_path = last_action["params"].get("target_file")
 
         if not file_path:
             raise ValueError("Missing target_file parameter")
 
         # Ensure path is relative to working directory
-        working_dir = shared.get("working_dir", "")
-        full_path = os.path.join(working_dir, file_path) if working_dir else file_path
+        full_path = _resolve(shared, file_path)
 
         # Use the reason for logging instead of explanation
         reason = last_action.get("reason", "No reason provided")
@@ -280,9 +345,9 @@ class ReadFileAction(Node):
         content, success = exec_res
 
         # Update the result in the last history entry
-        history = shared.get("history", [])
-        if history:
-            history[-1]["result"] = {"success": success, "content": content}
+        last_action = _last_action(shared)
+        if last_action:
+            last_action["result"] = {"success": success, "content": content}
 
 
 #############################################
@@ -291,11 +356,10 @@ class ReadFileAction(Node):
 class GrepSearchAction(Node):
     def prep(self, shared: Dict[str, Any]) -> Dict[str, Any]:
         # Get parameters from the last history entry
-        history = shared.get("history", [])
-        if not history:
+        last_action = _last_action(shared)
+        if last_action is None:
             raise ValueError("No history found")
 
-        last_action = history[-1]
         params = last_action["params"]
 
         if "query" not in params:
@@ -338,9 +402,9 @@ class GrepSearchAction(Node):
         matches, success = exec_res
 
         # Update the result in the last history entry
-        history = shared.get("history", [])
-        if history:
-            history[-1]["result"] = {"success": success, "matches": matches}
+        last_action = _last_action(shared)
+        if last_action:
+            last_action["result"] = {"success": success, "matches": matches}
 
 
 #############################################
@@ -349,11 +413,10 @@ class GrepSearchAction(Node):
 class ListDirAction(Node):
     def prep(self, shared: Dict[str, Any]) -> str:
         # Get parameters from the last history entry
-        history = shared.get("history", [])
-        if not history:
+        last_action = _last_action(shared)
+        if last_action is None:
             raise ValueError("No history found")
 
-        last_action = history[-1]
         path = last_action["params"].get("relative_workspace_path", ".")
 
         # Use the reason for logging instead of explanation
@@ -361,8 +424,7 @@ class ListDirAction(Node):
         logger.info(f"ListDirAction: {reason}")
 
         # Ensure path is relative to working directory
-        working_dir = shared.get("working_dir", "")
-        full_path = os.path.join(working_dir, path) if working_dir else path
+        full_path = _resolve(shared, path)
 
         return full_path
 
@@ -376,9 +438,14 @@ class ListDirAction(Node):
         success, tree_str = exec_res
 
         # Update the result in the last history entry with the new structure
-        history = shared.get("history", [])
-        if history:
-            history[-1]["result"] = {"success": success, "tree_visualization": tree_str}
+        last_action = _last_action(shared)
+        if last_action:
+            last_action["result"] = {
+                "success": success,
+                "tree_visualization": tree_str,
+                # Split once here instead of every time the history is formatted
+                "tree_lines": _split_tree_lines(tree_str) if isinstance(tree_str, str) else [],
+            }
 
 
 #############################################
@@ -387,11 +454,10 @@ class ListDirAction(Node):
 class DeleteFileAction(Node):
     def prep(self, shared: Dict[str, Any]) -> str:
         # Get parameters from the last history entry
-        history = shared.get("history", [])
-        if not history:
+        last_action = _last_action(shared)
+        if last_action is None:
             raise ValueError("No history found")
 
-        last_action = history[-1]
         file_path = last_action["params"].get("target_file")
 
         if not file_path:
@@ -402,8 +468,7 @@ class DeleteFileAction(Node):
         logger.info(f"DeleteFileAction: {reason}")
 
         # Ensure path is relative to working directory
-        working_dir = shared.get("working_dir", "")
-        full_path = os.path.join(working_dir, file_path) if working_dir else file_path
+        full_path = _resolve(shared, file_path)
 
         return full_path
 
@@ -415,9 +480,9 @@ class DeleteFileAction(Node):
         success, message = exec_res
 
         # Update the result in the last history entry
-        history = shared.get("history", [])
-        if history:
-            history[-1]["result"] = {"success": success, "message": message}
+        last_action = _last_action(shared)
+        if last_action:
+            last_action["result"] = {"success": success, "message": message}
 
 
 #############################################
@@ -426,19 +491,17 @@ class DeleteFileAction(Node):
 class ReadTargetFileNode(Node):
     def prep(self, shared: Dict[str, Any]) -> str:
         # Get parameters from the last history entry
-        history = shared.get("history", [])
-        if not history:
+        last_action = _last_action(shared)
+        if last_action is None:
             raise ValueError("No history found")
 
-        last_action = history[-1]
         file_path = last_action["params"].get("target_file")
 
         if not file_path:
             raise ValueError("Missing target_file parameter")
 
         # Ensure path is relative to working directory
-        working_dir = shared.get("working_dir", "")
-        full_path = os.path.join(working_dir, file_path) if working_dir else file_path
+        full_path = _resolve(shared, file_path)
 
         return full_path
 
@@ -451,50 +514,15 @@ class ReadTargetFileNode(Node):
         logger.info("ReadTargetFileNode: File read completed for editing")
 
         # Store file content in the history entry
-        history = shared.get("history", [])
-        if history:
-            history[-1]["file_content"] = content
+        last_action = _last_action(shared)
+        if last_action:
+            last_action["file_content"] = content
 
 
 #############################################
 # Analyze and Plan Changes Node
 #############################################
-class AnalyzeAndPlanNode(Node):
-    def prep(self, shared: Dict[str, Any]) -> Dict[str, Any]:
-        # Get history
-        history = shared.get("history", [])
-        if not history:
-            raise ValueError("No history found")
-
-        last_action = history[-1]
-        file_content = last_action.get("file_content")
-        instructions = last_action["params"].get("instructions")
-        code_edit = last_action["params"].get("code_edit")
-
-        if not file_content:
-            raise ValueError("File content not found")
-        if not instructions:
-            raise ValueError("Missing instructions parameter")
-        if not code_edit:
-            raise ValueError("Missing code_edit parameter")
-
-        return {
-            "file_content": file_content,
-            "instructions": instructions,
-            "code_edit": code_edit,
-        }
-
-    def exec(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
-        file_content = params["file_content"]
-        instructions = params["instructions"]
-        code_edit = params["code_edit"]
-
-        # File content as lines
-        file_lines = file_content.split("\n")
-        total_lines = len(file_lines)
-
-        # Generate a prompt for the LLM to analyze the edit using YAML instead of JSON
-        prompt = f"""
+_ANALYZE_AND_PLAN_PROMPT = """
 As a code editing assistant, I need to convert the following code edit instruction
 and code edit pattern into specific edit operations (start_line, end_line, replacement).
 
@@ -546,27 +574,149 @@ If the instruction indicates content should be appended to the file, set both st
 to the maximum line number + 1, which will add the content at the end of the file.
 """
 
-        # Call LLM to analyze
-        response = call_llm(prompt)
+
+# Marker lines that stand in for unchanged code in a code_edit
+_EXISTING_CODE_MARKERS = ("// ... existing code ...", "# ... existing code ...")
+
+
+def _find_unique_line(lines: List[str], target: str) -> Optional[int]:
+    """Return the 1-based number of the only line equal to target, or None if it is missing or repeated."""
+    found = None
+    for i, line in enumerate(lines):
+        if line == target:
+            if found is not None:
+                return None
+            found = i + 1
+    return found
+
+
+def _plan_edit_locally(file_content: str, code_edit: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Work out edit operations without the LLM when the edit pattern is unambiguous.
+
+    The code edit is split on "... existing code ..." marker lines (at most one is
+    supported). Each remaining chunk must start and end with lines that occur exactly
+    once in the file, in order; the chunk then replaces that line range. Every line in
+    the range must also appear in the chunk, in order, so lines the edit left out
+    without a marker are never deleted; anything else is left to the LLM.
+
+    Args:
+        file_content: File content as returned by read_file (with "N: " line prefixes)
+        code_edit: The edit pattern from the edit_file action
+
+    Returns:
+        List of edit operations, or None if the LLM is needed to place the edit
+    """
+    # Strip the "N: " prefixes added by read_file
+    file_lines = [line.partition(": ")[2].rstrip() for line in file_content.split("\n")]
+
+    chunks: List[List[str]] = [[]]
+    for line in code_edit.splitlines():
+        if "... existing code ..." in line:
+            if line.strip() not in _EXISTING_CODE_MARKERS or len(chunks) > 1:
+                return None
+            chunks.append([])
+        else:
+            chunks[-1].append(line)
+
+    operations = []
+    previous_end = 0
+    for chunk in chunks:
+        # Blank lines at the edges can't anchor a chunk and sit outside its range anyway
+        while chunk and not chunk[0].strip():
+            chunk.pop(0)
+        while chunk and not chunk[-1].strip():
+            chunk.pop()
+        if not chunk:
+            continue
+
+        start_line = _find_unique_line(file_lines, chunk[0].rstrip())
+        end_line = _find_unique_line(file_lines, chunk[-1].rstrip())
+        if start_line is None or end_line is None or not previous_end < start_line <= end_line:
+            return None
+
+        # The chunk may add lines between the originals but must keep every one of them
+        remaining = iter(line.rstrip() for line in chunk)
+        if not all(line in remaining for line in file_lines[start_line - 1 : end_line]):
+            return None
+
+        operations.append({"start_line": start_line, "end_line": end_line, "replacement": "\n".join(chunk) + "\n"})
+        previous_end = end_line
+
+    return operations or None
+
+
+def _validate_operations(operations: List[Dict[str, Any]], total_lines: int) -> None:
+    """Check that every edit operation has a replacement and an ordered line range inside the file."""
+    for op in operations:
+        # A single chained comparison accepts the common, well-formed operation
+        if "replacement" in op and 1 <= op.get("start_line", 0) <= op.get("end_line", 0) <= total_lines:
+            continue
+
+        # Otherwise check field by field to report what is wrong
+        assert "start_line" in op, "start_line is missing"
+        assert "end_line" in op, "end_line is missing"
+        assert "replacement" in op, "replacement is missing"
+        assert 1 <= op["start_line"] <= total_lines, f"start_line out of range: {op['start_line']}"
+        assert 1 <= op["end_line"] <= total_lines, f"end_line out of range: {op['end_line']}"
+        assert op["start_line"] <= op["end_line"], f"start_line > end_line: {op['start_line']} > {op['end_line']}"
+
+
+class AnalyzeAndPlanNode(Node):
+    def prep(self, shared: Dict[str, Any]) -> Dict[str, Any]:
+        # Get history
+        last_action = _last_action(shared)
+        if last_action is None:
+            raise ValueError("No history found")
+
+        file_content = last_action.get("file_content")
+        instructions = last_action["params"].get("instructions")
+        code_edit = last_action["params"].get("code_edit")
+
+        if not file_content:
+            raise ValueError("File content not found")
+        if not instructions:
+            raise ValueError("Missing instructions parameter")
+        if not code_edit:
+            raise ValueError("Missing code_edit parameter")
+
+        return {
+            "file_content": file_content,
+            "instructions": instructions,
+            "code_edit": code_edit,
+        }
+
+    def exec(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        file_content = params["file_content"]
+        instructions = params["instructions"]
+        code_edit = params["code_edit"]
+
+        # Anchor the edit by plain string matching when possible to skip an LLM call
+        operations = _plan_edit_locally(file_content, code_edit)
+        if operations is not None:
+            logger.info(f"AnalyzeAndPlanNode: Planned {len(operations)} edit operation(s) without the LLM")
+            return {
+                "reasoning": "Edit chunks matched unique anchor lines in the file; planned without the LLM.",
+                "operations": operations,
+            }
+
+        # File content as lines
+        file_lines = file_content.split("\n")
+        total_lines = len(file_lines)
+
+        # Generate a prompt for the LLM to analyze the edit using YAML instead of JSON
+        prompt = _ANALYZE_AND_PLAN_PROMPT.format(
+            file_content=file_content, instructions=instructions, code_edit=code_edit
+        )
+
+        # Call LLM to analyze, reusing the response for a repeated prompt
+        response = cached_llm_call(prompt, call_llm)
 
         # Look for YAML structure in the response
-        yaml_content = ""
-        if "```yaml" in response:
-            yaml_blocks = response.split("```yaml")
-            if len(yaml_blocks) > 1:
-                yaml_content = yaml_blocks[1].split("```")[0].strip()
-        elif "```yml" in response:
-            yaml_blocks = response.split("```yml")
-            if len(yaml_blocks) > 1:
-                yaml_content = yaml_blocks[1].split("```")[0].strip()
-        elif "```" in response:
-            # Try to extract from generic code block
-            yaml_blocks = response.split("```")
-            if len(yaml_blocks) > 1:
-                yaml_content = yaml_blocks[1].strip()
+        yaml_content = _extract_yaml(response)
 
         if yaml_content:
-            decision = yaml.safe_load(yaml_content)
+            decision = yaml.load(yaml_content, Loader=_YamlLoader)
 
             # Validate the required fields
             assert "reasoning" in decision, "Reasoning is missing"
@@ -577,15 +727,7 @@ to the maximum line number + 1, which will add the content at the end of the fil
                 raise ValueError("Operations are not a list")
 
             # Validate operations
-            for op in decision["operations"]:
-                assert "start_line" in op, "start_line is missing"
-                assert "end_line" in op, "end_line is missing"
-                assert "replacement" in op, "replacement is missing"
-                assert 1 <= op["start_line"] <= total_lines, f"start_line out of range: {op['start_line']}"
-                assert 1 <= op["end_line"] <= total_lines, f"end_line out of range: {op['end_line']}"
-                assert (
-                    op["start_line"] <= op["end_line"]
-                ), f"start_line > end_line: {op['start_line']} > {op['end_line']}"
+            _validate_operations(decision["operations"], total_lines)
 
             return decision
         else:
@@ -598,9 +740,9 @@ to the maximum line number + 1, which will add the content at the end of the fil
 
 
 #############################################
-# Apply Changes Batch Node
+# Apply Changes Node
 #############################################
-class ApplyChangesNode(BatchNode):
+class ApplyChangesNode(Node):
     def prep(self, shared: Dict[str, Any]) -> List[Dict[str, Any]]:
         # Get edit operations
         edit_operations = shared.get("edit_operations", [])
@@ -613,19 +755,17 @@ class ApplyChangesNode(BatchNode):
         sorted_ops = sorted(edit_operations, key=lambda op: op["start_line"], reverse=True)
 
         # Get target file from history
-        history = shared.get("history", [])
-        if not history:
+        last_action = _last_action(shared)
+        if last_action is None:
             raise ValueError("No history found")
 
-        last_action = history[-1]
         target_file = last_action["params"].get("target_file")
 
         if not target_file:
             raise ValueError("Missing target_file parameter")
 
         # Ensure path is relative to working directory
-        working_dir = shared.get("working_dir", "")
-        full_path = os.path.join(working_dir, target_file) if working_dir else target_file
+        full_path = _resolve(shared, target_file)
 
         # Attach file path to each operation
         for op in sorted_ops:
@@ -633,31 +773,33 @@ class ApplyChangesNode(BatchNode):
 
         return sorted_ops
 
-    def exec(self, op: Dict[str, Any]) -> Tuple[bool, str]:
-        # Call replace_file utility which returns (success, message)
-        return replace_file(
-            target_file=op["target_file"],
-            start_line=op["start_line"],
-            end_line=op["end_line"],
-            content=op["replacement"],
+    def exec(self, ops: List[Dict[str, Any]]) -> List[Tuple[str, bool]]:
+        if not ops:
+            return []
+
+        # Apply all operations with a single read and write of the target file;
+        # replace_file_batch returns one (message, success) tuple per operation
+        return replace_file_batch(
+            ops[0]["target_file"],
+            [(op["start_line"], op["end_line"], op["replacement"]) for op in ops],
         )
 
     def post(
         self,
         shared: Dict[str, Any],
         prep_res: List[Dict[str, Any]],
-        exec_res_list: List[Tuple[bool, str]],
+        exec_res_list: List[Tuple[str, bool]],
     ) -> str:
         # Check if all operations were successful
-        all_successful = all(success for success, _ in exec_res_list)
+        all_successful = all(success for _, success in exec_res_list)
 
         # Format results for history
-        result_details = [{"success": success, "message": message} for success, message in exec_res_list]
+        result_details = [{"success": success, "message": message} for message, success in exec_res_list]
 
         # Update edit result in history
-        history = shared.get("history", [])
-        if history:
-            history[-1]["result"] = {
+        last_action = _last_action(shared)
+        if last_action:
+            last_action["result"] = {
                 "success": all_successful,
                 "operations": len(exec_res_list),
                 "details": result_details,
@@ -672,23 +814,7 @@ class ApplyChangesNode(BatchNode):
 #############################################
 # Format Response Node
 #############################################
-class FormatResponseNode(Node):
-    def prep(self, shared: Dict[str, Any]) -> List[Dict[str, Any]]:
-        # Get history
-        history = shared.get("history", [])
-
-        return history
-
-    def exec(self, history: List[Dict[str, Any]]) -> str:
-        # If no history, return a generic message
-        if not history:
-            return "No actions were performed."
-
-        # Generate a summary of actions for the LLM using the utility function
-        actions_summary = format_history_summary(history)
-
-        # Prompt for the LLM to generate the final response
-        prompt = f"""
+_FORMAT_RESPONSE_PROMPT = """
 You are a coding assistant. You have just performed a series of actions based on the
 user's request. Summarize what you did in a clear, helpful response.
 
@@ -706,6 +832,25 @@ IMPORTANT:
 - When providing code examples or structured information, use YAML format enclosed in triple backticks
 """
 
+
+class FormatResponseNode(Node):
+    def prep(self, shared: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # Get history
+        history = shared.get("history", [])
+
+        return history
+
+    def exec(self, history: List[Dict[str, Any]]) -> str:
+        # If no history, return a generic message
+        if not history:
+            return "No actions were performed."
+
+        # Generate a summary of actions for the LLM using the utility function
+        actions_summary = format_history_summary(history)
+
+        # Prompt for the LLM to generate the final response
+        prompt = _FORMAT_RESPONSE_PROMPT.format(actions_summary=actions_summary)
+
         # Call LLM to generate response
         response = call_llm(prompt)
 
@@ -723,6 +868,7 @@ IMPORTANT:
 #############################################
 # Edit Agent Flow
 #############################################
+@functools.cache
 def create_edit_agent() -> Flow:
     # Create nodes
     read_target = ReadTargetFileNode()
@@ -740,6 +886,8 @@ def create_edit_agent() -> Flow:
 #############################################
 # Main Flow
 #############################################
+# Built once on first use; nodes keep no run state (it all lives in shared), so the graph is reusable
+@functools.cache
 def create_main_flow() -> Flow:
     # Create nodes
     main_agent = MainDecisionAgent()
@@ -767,7 +915,3 @@ def create_main_flow() -> Flow:
 
     # Create flow
     return Flow(start=main_agent)
-
-
-# Create the main flow
-coding_agent_flow = create_main_flow()
@@ -1,18 +1,41 @@
 import os
 import argparse
 import logging
-from .flow import coding_agent_flow
-
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(), logging.FileHandler("coding_agent.log")],
-)
+import queue
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
 
 logger = logging.getLogger("main")
 
 
+def setup_logging() -> QueueListener:
+    """
+    Configure logging for the coding agent. Called at run time rather than import
+    time so importing the package (or running --help) never opens the log file.
+
+    Records are only enqueued on the calling thread; a background listener writes
+    them to the console and the log file, so disk I/O stays out of the flow. File
+    records are buffered and written in batches of up to 128, or at once on ERROR.
+
+    Returns:
+        The started listener; stop it and flush its handlers before exiting
+    """
+    log_queue = queue.Queue(-1)
+
+    # basicConfig formats records in the QueueHandler, so the listener's handlers
+    # receive the final message and need no formatter of their own
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[QueueHandler(log_queue)],
+    )
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    file_handler = MemoryHandler(capacity=128, flushLevel=logging.ERROR, target=logging.FileHandler("coding_agent.log"))
+    listener = QueueListener(log_queue, logging.StreamHandler(), file_handler)
+    listener.start()
+    return listener
+
+
 def main():
     """
     Run the coding agent to help with code operations
@@ -34,6 +57,11 @@ def main():
     if not user_query:
         user_query = input("What would you like me to help you with? ")
 
+    listener = setup_logging()
+
+    # Import the flow lazily: it pulls in the LLM SDK and every utility module
+    from .flow import create_main_flow
+
     # Initialize shared memory
     shared = {
         "user_query": user_query,
@@ -45,7 +73,12 @@ def main():
     logger.info(f"Working directory: {args.working_dir}")
 
     # Run the flow
-    coding_agent_flow.run(shared)
+    try:
+        create_main_flow().run(shared)
+    finally:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.flush()
 
 
 if __name__ == "__main__":
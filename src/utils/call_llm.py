@@ -1,6 +1,7 @@
 from anthropic import AnthropicVertex
 import os
 import logging
+from logging.handlers import MemoryHandler
 import json
 from datetime import datetime
 
@@ -14,7 +15,8 @@ logger = logging.getLogger("llm_logger")
 logger.setLevel(logging.INFO)
 file_handler = logging.FileHandler(log_file)
 file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-logger.addHandler(file_handler)
+# Buffer records and write them in batches; errors and interpreter exit flush the buffer
+logger.addHandler(MemoryHandler(capacity=128, flushLevel=logging.ERROR, target=file_handler))
 
 # Simple cache configuration
 cache_file = "llm_cache.json"
@@ -1,5 +1,6 @@
 import os
 from typing import Tuple
+from .read_file import invalidate_read_cache
 
 
 def delete_file(target_file: str) -> Tuple[str, bool]:
@@ -17,6 +18,7 @@ def delete_file(target_file: str) -> Tuple[str, bool]:
             return f"File {target_file} does not exist", False
 
         os.remove(target_file)
+        invalidate_read_cache(target_file)
         return f"Successfully deleted {target_file}", True
 
     except Exception as e:
@@ -1,5 +1,6 @@
 import os
 from typing import Tuple
+from .read_file import invalidate_read_cache
 
 
 def insert_file(target_file: str, content: str, line_number: int = None) -> Tuple[str, bool]:
@@ -31,6 +32,7 @@ def insert_file(target_file: str, content: str, line_number: int = None) -> Tupl
             # Create the file with new content
             with open(target_file, "w", encoding="utf-8") as f:
                 f.write(content)
+            invalidate_read_cache(target_file)
 
             return f"Successfully {operation} {target_file}", True
 
@@ -70,6 +72,7 @@ def insert_file(target_file: str, content: str, line_number: int = None) -> Tupl
             # Write the updated content
             with open(target_file, "w", encoding="utf-8") as f:
                 f.writelines(lines)
+            invalidate_read_cache(target_file)
 
             return f"Successfully {operation} {target_file} at line {line_number}", True
 
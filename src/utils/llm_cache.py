@@ -0,0 +1,72 @@
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# Maximum number of responses kept in memory before the oldest is evicted
+MAX_ENTRIES = 128
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+def _cache_key(prompt: str) -> str:
+    """
+    Build the cache key for a prompt.
+
+    Only line endings and surrounding whitespace are normalized: prompts embed
+    source code, so case and indentation are significant and must not be folded.
+    """
+    normalized = prompt.replace("\r\n", "\n").strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def get_cached_response(prompt: str) -> Optional[str]:
+    """Return the cached response for a prompt, or None on a miss."""
+    key = _cache_key(prompt)
+    response = _cache.get(key)
+    if response is not None:
+        _cache.move_to_end(key)
+    return response
+
+
+def store_response(prompt: str, response: str) -> None:
+    """Store a response, evicting the least recently used entry when full."""
+    key = _cache_key(prompt)
+    _cache[key] = response
+    _cache.move_to_end(key)
+    while len(_cache) > MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+
+def cached_llm_call(prompt: str, llm: Callable[[str], str]) -> str:
+    """
+    Return the response for a prompt, only calling the LLM on a cache miss.
+
+    Args:
+        prompt: The prompt to send
+        llm: Function that takes a prompt and returns the response text
+
+    Returns:
+        The (possibly cached) response text
+    """
+    response = get_cached_response(prompt)
+    if response is None:
+        response = llm(prompt)
+        store_response(prompt, response)
+    return response
+
+
+def clear_llm_cache() -> None:
+    """Drop every cached response."""
+    _cache.clear()
+
+
+if __name__ == "__main__":
+    calls = []
+
+    def fake_llm(prompt: str) -> str:
+        calls.append(prompt)
+        return f"response to: {prompt}"
+
+    print(cached_llm_call("Hello", fake_llm))
+    print(cached_llm_call("  Hello\n", fake_llm))
+    print(f"LLM was called {len(calls)} time(s)")
@@ -1,5 +1,44 @@
 import os
-from typing import Tuple, Optional
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+# Maximum number of files whose lines are kept in memory
+MAX_CACHED_FILES = 32
+
+# Absolute path -> ((st_ino, st_mtime_ns, st_size), lines)
+_line_cache: "OrderedDict[str, Tuple[Tuple[int, int, int], List[str]]]" = OrderedDict()
+
+
+def _read_lines(target_file: str) -> List[str]:
+    """
+    Return the lines of a file, reusing the cached copy while the file's inode,
+    mtime and size are unchanged. The returned list must not be modified.
+    """
+    path = os.path.abspath(target_file)
+    st = os.stat(path)
+    signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    cached = _line_cache.get(path)
+    if cached is not None and cached[0] == signature:
+        _line_cache.move_to_end(path)
+        return cached[1]
+
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+
+    _line_cache[path] = (signature, lines)
+    _line_cache.move_to_end(path)
+    while len(_line_cache) > MAX_CACHED_FILES:
+        _line_cache.popitem(last=False)
+    return lines
+
+
+def invalidate_read_cache(target_file: str) -> None:
+    """
+    Drop the cached lines for a file. Utilities that write files call this so a
+    rewrite within the filesystem's timestamp granularity is never served stale.
+    """
+    _line_cache.pop(os.path.abspath(target_file), None)
 
 
 def read_file(
@@ -29,47 +68,44 @@ def read_file(
         if start_line_one_indexed is None or end_line_one_indexed_inclusive is None:
             should_read_entire_file = True
 
-        with open(target_file, "r", encoding="utf-8") as f:
-            if should_read_entire_file:
-                lines = f.readlines()
-                # Add line numbers to each line
-                numbered_lines = [f"{i+1}: {line}" for i, line in enumerate(lines)]
-                return "".join(numbered_lines), True
+        lines = _read_lines(target_file)
 
-            # Validate line range parameters
-            if start_line_one_indexed < 1:
-                return "Error: start_line_one_indexed must be at least 1", False
+        if should_read_entire_file:
+            # Add line numbers to each line
+            numbered_lines = [f"{i+1}: {line}" for i, line in enumerate(lines)]
+            return "".join(numbered_lines), True
 
-            if end_line_one_indexed_inclusive < start_line_one_indexed:
-                return (
-                    "Error: end_line_one_indexed_inclusive must be >= start_line_one_indexed",
-                    False,
-                )
+        # Validate line range parameters
+        if start_line_one_indexed < 1:
+            return "Error: start_line_one_indexed must be at least 1", False
 
-            # Check if requested range exceeds 250 lines limit
-            if end_line_one_indexed_inclusive - start_line_one_indexed + 1 > 250:
-                return "Error: Cannot read more than 250 lines at once", False
+        if end_line_one_indexed_inclusive < start_line_one_indexed:
+            return (
+                "Error: end_line_one_indexed_inclusive must be >= start_line_one_indexed",
+                False,
+            )
 
-            # Read the specified lines
-            lines = f.readlines()
+        # Check if requested range exceeds 250 lines limit
+        if end_line_one_indexed_inclusive - start_line_one_indexed + 1 > 250:
+            return "Error: Cannot read more than 250 lines at once", False
 
-            # Adjust for one-indexed to zero-indexed
-            start_idx = start_line_one_indexed - 1
-            end_idx = end_line_one_indexed_inclusive - 1
+        # Adjust for one-indexed to zero-indexed
+        start_idx = start_line_one_indexed - 1
+        end_idx = end_line_one_indexed_inclusive - 1
 
-            # Check if the requested range is out of bounds
-            if start_idx >= len(lines):
-                return (
-                    f"Error: start_line_one_indexed ({start_line_one_indexed}) exceeds file length ({len(lines)})",
-                    False,
-                )
+        # Check if the requested range is out of bounds
+        if start_idx >= len(lines):
+            return (
+                f"Error: start_line_one_indexed ({start_line_one_indexed}) exceeds file length ({len(lines)})",
+                False,
+            )
 
-            end_idx = min(end_idx, len(lines) - 1)
+        end_idx = min(end_idx, len(lines) - 1)
 
-            # Add line numbers to the selected lines
-            numbered_lines = [f"{i+1}: {lines[i]}" for i in range(start_idx, end_idx + 1)]
+        # Add line numbers to the selected lines
+        numbered_lines = [f"{i+1}: {lines[i]}" for i in range(start_idx, end_idx + 1)]
 
-            return "".join(numbered_lines), True
+        return "".join(numbered_lines), True
 
     except Exception as e:
         return f"Error reading file: {str(e)}", False
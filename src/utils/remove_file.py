@@ -1,5 +1,6 @@
 import os
 from typing import Tuple
+from .read_file import invalidate_read_cache
 
 
 def remove_file(target_file: str, start_line: int = None, end_line: int = None) -> Tuple[str, bool]:
@@ -63,6 +64,7 @@ def remove_file(target_file: str, start_line: int = None, end_line: int = None)
         # Write the updated content back to the file
         with open(target_file, "w", encoding="utf-8") as f:
             f.writelines(lines)
+        invalidate_read_cache(target_file)
 
         # Prepare message based on what was removed
         if start_line is None:
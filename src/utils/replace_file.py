@@ -1,7 +1,9 @@
+import io
 import os
-from typing import Tuple
+from typing import List, Tuple
 from .remove_file import remove_file
 from .insert_file import insert_file
+from .read_file import invalidate_read_cache
 
 
 def replace_file(target_file: str, start_line: int, end_line: int, content: str) -> Tuple[str, bool]:
@@ -54,6 +56,71 @@ def replace_file(target_file: str, start_line: int, end_line: int, content: str)
         return f"Error replacing content: {str(e)}", False
 
 
+def replace_file_batch(target_file: str, operations: List[Tuple[int, int, str]]) -> List[Tuple[str, bool]]:
+    """
+    Apply several line-range replacements to a file with a single read and a single write.
+
+    Each operation behaves like a replace_file() call. Operations are applied in the given
+    order, so they should be sorted bottom-to-top to keep line numbers valid.
+
+    Args:
+        target_file: Path to the file to modify
+        operations: List of (start_line, end_line, content) tuples (1-indexed, inclusive)
+
+    Returns:
+        List of (result message, success status) tuples, one per operation
+    """
+    try:
+        if not os.path.exists(target_file):
+            return [(f"Error: File {target_file} does not exist", False)] * len(operations)
+
+        with open(target_file, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+
+        results = []
+        for start_line, end_line, content in operations:
+            # Validate line numbers
+            if start_line < 1:
+                results.append(("Error: start_line must be at least 1", False))
+                continue
+
+            if end_line < 1:
+                results.append(("Error: end_line must be at least 1", False))
+                continue
+
+            if start_line > end_line:
+                results.append(("Error: start_line must be less than or equal to end_line", False))
+                continue
+
+            # Remove the specified lines (same clamping as remove_file)
+            position = start_line - 1
+            if position < len(lines):
+                del lines[position : min(end_line, len(lines))]
+
+            # Insert the new content at the start line (same padding as insert_file)
+            while len(lines) < position:
+                lines.append("\n")
+
+            if position == len(lines) and lines and not lines[-1].endswith("\n"):
+                lines[-1] += "\n"
+            lines.insert(position, content)
+
+            # Re-split so the next operation sees the same lines a re-read of the file would
+            lines = io.StringIO("".join(lines), newline=None).readlines()
+
+            results.append((f"Successfully replaced lines {start_line} to {end_line} in {target_file}", True))
+
+        # Write the updated content back once
+        with open(target_file, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        invalidate_read_cache(target_file)
+
+        return results
+
+    except Exception as e:
+        return [(f"Error replacing content: {str(e)}", False)] * len(operations)
+
+
 if __name__ == "__main__":
     # Test replace_file with a temporary file
     temp_file = "temp_replace_test.txt"
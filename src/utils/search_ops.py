@@ -1,6 +1,15 @@
+import functools
+import io
+import itertools
 import os
 import re
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Iterator, Tuple, Optional
+
+# Characters that give a query regex meaning; a query without them matches as plain text
+_REGEX_METACHARACTERS = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+# Files shorter than this many characters are read whole; longer ones are streamed line by line
+_MAX_IN_MEMORY_CHARS = 1 << 20
 
 
 def grep_search(
@@ -12,6 +21,7 @@ def grep_search(
 ) -> Tuple[List[Dict[str, Any]], bool]:
     """
     Search through files for specific patterns using regex.
+    Files with a NUL character in their first 8 KB are treated as binary and skipped.
 
     Args:
         query: Regex pattern to find
@@ -35,52 +45,67 @@ def grep_search(
     try:
         # Compile the regex pattern
         try:
-            pattern = re.compile(query, 0 if case_sensitive else re.IGNORECASE)
+            pattern = _compile_pattern(query, case_sensitive)
         except re.error as e:
             print(f"Invalid regex pattern: {str(e)}")
             return [], False
 
+        # A plain-text query can only match a line if the file contains it, so
+        # files without it are ruled out with one substring test
+        literal = query if case_sensitive and not _REGEX_METACHARACTERS.search(query) else None
+
         # Convert glob patterns to regex for file matching
-        include_regexes = _glob_to_regex(include_pattern) if include_pattern else None
-        exclude_regexes = _glob_to_regex(exclude_pattern) if exclude_pattern else None
+        include_regex = _glob_to_union_regex(include_pattern) if include_pattern else None
+        exclude_regex = _glob_to_union_regex(exclude_pattern) if exclude_pattern else None
 
         # Walk through the directory and search files
-        for root, _, files in os.walk(search_dir):
-            for filename in files:
-                # Skip files that don't match inclusion pattern
-                if include_regexes and not any(r.match(filename) for r in include_regexes):
-                    continue
-
-                # Skip files that match exclusion pattern
-                if exclude_regexes and any(r.match(filename) for r in exclude_regexes):
-                    continue
-
-                file_path = os.path.join(root, filename)
-
-                try:
-                    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                        for i, line in enumerate(f, 1):
-                            if pattern.search(line):
-                                results.append(
-                                    {
-                                        "file": file_path,
-                                        "line_number": i,
-                                        "content": line.rstrip(),
-                                    }
-                                )
-
-                                # Limit to 50 results
-                                if len(results) >= 50:
-                                    break
-                except Exception:
-                    # Skip files that can't be read
-                    continue
-
-                if len(results) >= 50:
-                    break
-
-            if len(results) >= 50:
-                break
+        for entry in _iter_files(search_dir):
+            filename = entry.name
+
+            # Skip files that don't match inclusion pattern
+            if include_regex and not include_regex.match(filename):
+                continue
+
+            # Skip files that match exclusion pattern
+            if exclude_regex and exclude_regex.match(filename):
+                continue
+
+            file_path = entry.path
+
+            try:
+                with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+                    # Read small files whole; larger ones are read up to the end of the
+                    # line at the threshold and the rest is streamed
+                    head = f.read(_MAX_IN_MEMORY_CHARS)
+                    whole = len(head) < _MAX_IN_MEMORY_CHARS
+                    if not whole:
+                        head += f.readline()
+
+                    # Like grep, treat a file with a NUL character near the start as binary
+                    if head.find("\x00", 0, 8192) != -1:
+                        continue
+
+                    if whole and literal is not None and literal not in head:
+                        continue
+
+                    # StringIO splits on "\n" only, giving the same lines as iterating the file
+                    lines = io.StringIO(head) if whole else itertools.chain(io.StringIO(head), f)
+                    for i, line in enumerate(lines, 1):
+                        if pattern.search(line):
+                            results.append(
+                                {
+                                    "file": file_path,
+                                    "line_number": i,
+                                    "content": line.rstrip(),
+                                }
+                            )
+
+                            # Limit to 50 results
+                            if len(results) >= 50:
+                                return results, True
+            except Exception:
+                # Skip files that can't be read
+                continue
 
         return results, True
 
@@ -89,8 +114,50 @@ def grep_search(
         return [], False
 
 
-def _glob_to_regex(pattern_str: str) -> List[re.Pattern]:
-    """Convert comma-separated glob patterns to regex patterns."""
+@functools.lru_cache(maxsize=256)
+def _compile_pattern(query: str, case_sensitive: bool) -> re.Pattern:
+    """Compile a search query once per (query, case_sensitive) pair."""
+    return re.compile(query, 0 if case_sensitive else re.IGNORECASE)
+
+
+def _iter_files(search_dir: str) -> Iterator[os.DirEntry]:
+    """
+    Yield the non-directory entries under search_dir, top-down like os.walk.
+
+    The file type comes from the directory listing itself, so no extra stat is
+    needed per entry. Symlinked directories are not followed and unreadable
+    directories are skipped.
+    """
+    stack = [search_dir]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if not is_dir:
+                yield entry
+            elif not entry.is_symlink():
+                subdirs.append(entry.path)
+
+        # Push in reverse so subdirectories are visited in listing order
+        stack.extend(reversed(subdirs))
+
+
+@functools.lru_cache(maxsize=512)
+def _glob_to_regex(pattern_str: str) -> Tuple[re.Pattern, ...]:
+    """
+    Convert comma-separated glob patterns to regex patterns.
+
+    Results are cached per pattern string, so the tuple is shared between callers.
+    """
     patterns = []
 
     for glob in pattern_str.split(","):
@@ -109,7 +176,20 @@ def _glob_to_regex(pattern_str: str) -> List[re.Pattern]:
             # Skip invalid patterns
             continue
 
-    return patterns
+    return tuple(patterns)
+
+
+@functools.lru_cache(maxsize=512)
+def _glob_to_union_regex(pattern_str: str) -> Optional[re.Pattern]:
+    """
+    Combine comma-separated glob patterns into one regex, or None if none are valid.
+
+    A filename is checked against all the globs with a single match call.
+    """
+    patterns = _glob_to_regex(pattern_str)
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{p.pattern})" for p in patterns))
 
 
 if __name__ == "__main__":
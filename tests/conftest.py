@@ -1,41 +1,79 @@
+import copy
 import pytest
-import tempfile
 import os
 from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import Mock
 
-@pytest.fixture
-def temp_working_dir():
-    """Create a temporary working directory for tests."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        yield temp_dir
+# Canonical test data, built once and handed out by the session-scoped fixtures below
+SAMPLE_SHARED_STATE = {
+    "user_query": "test query",
+    "working_dir": "/tmp/test",
+    "history": [],
+    "response": None
+}
 
-@pytest.fixture
-def sample_shared_state():
-    """Provide a standard shared state for testing."""
-    return {
-        "user_query": "test query",
-        "working_dir": "/tmp/test",
-        "history": [],
-        "response": None
+SAMPLE_HISTORY = [
+    {
+        "tool": "read_file",
+        "reason": "Reading configuration file",
+        "params": {"target_file": "config.yaml"},
+        "result": {"success": True, "content": "sample: content"},
+        "timestamp": "2024-01-01T10:00:00"
     }
+]
+
+def pytest_addoption(parser):
+    """Add the --smoke option that enables trivial framework probes."""
+    parser.addoption("--smoke", action="store_true", default=False, help="also run tests marked smoke")
+
+def pytest_configure(config):
+    """Register custom markers (pytest.ini's [tool:pytest] section is not read by pytest)."""
+    config.addinivalue_line("markers", "smoke: trivial framework probes, skipped unless --smoke is given")
+    config.addinivalue_line("markers", "errorpath: rarely changing error branches; deselect with -m 'not errorpath'")
+
+def pytest_collection_modifyitems(config, items):
+    """Skip smoke-marked tests unless --smoke is given."""
+    if config.getoption("--smoke"):
+        return
+    skip_smoke = pytest.mark.skip(reason="smoke probe; run with --smoke")
+    for item in items:
+        if "smoke" in item.keywords:
+            item.add_marker(skip_smoke)
+
+@pytest.fixture(scope="session")
+def temp_working_dir(tmp_path_factory):
+    """Create one temporary working directory shared by the whole test session."""
+    return str(tmp_path_factory.mktemp("work"))
+
+@pytest.fixture(scope="session")
+def sample_shared_state():
+    """Provide a standard shared state for testing. Shared by all tests, so do not mutate it."""
+    return SAMPLE_SHARED_STATE
 
 @pytest.fixture
-def mock_llm_response():
-    """Mock LLM API responses."""
-    with patch('src.utils.call_llm.call_llm') as mock:
-        mock.return_value = "Mocked LLM response"
-        yield mock
+def fresh_sample_shared_state(sample_shared_state):
+    """Provide a private copy of the standard shared state for tests that modify it."""
+    return copy.deepcopy(sample_shared_state)
+
+@pytest.fixture(scope="session")
+def _llm_mock():
+    """Build the call_llm mock once; mock_llm_response installs it per test."""
+    return Mock()
 
 @pytest.fixture
+def mock_llm_response(_llm_mock, monkeypatch):
+    """Mock LLM API responses, with calls and configuration reset for each test."""
+    _llm_mock.reset_mock(return_value=True, side_effect=True)
+    _llm_mock.return_value = "Mocked LLM response"
+    monkeypatch.setattr("src.utils.call_llm.call_llm", _llm_mock)
+    return _llm_mock
+
+@pytest.fixture(scope="session")
 def sample_history():
-    """Provide sample action history for testing."""
-    return [
-        {
-            "tool": "read_file",
-            "reason": "Reading configuration file",
-            "params": {"target_file": "config.yaml"},
-            "result": {"success": True, "content": "sample: content"},
-            "timestamp": "2024-01-01T10:00:00"
-        }
-    ]
\ No newline at end of file
+    """Provide sample action history for testing. Shared by all tests, so do not mutate it."""
+    return SAMPLE_HISTORY
+
+@pytest.fixture
+def fresh_sample_history(sample_history):
+    """Provide a private copy of the sample history for tests that modify it."""
+    return copy.deepcopy(sample_history)
\ No newline at end of file
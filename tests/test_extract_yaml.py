@@ -0,0 +1,42 @@
+"""Tests for the _extract_yaml helper."""
+
+import pytest
+from src.flow import _extract_yaml
+
+
+class TestExtractYaml:
+    """Test extracting YAML blocks from LLM responses."""
+    
+    def test_yaml_block(self):
+        """Test extracting a ```yaml block."""
+        response = "Here is my decision:\n```yaml\ntool: finish\nreason: done\n```\nThanks"
+        
+        assert _extract_yaml(response) == "tool: finish\nreason: done"
+    
+    def test_yml_block(self):
+        """Test extracting a ```yml block."""
+        response = "```yml\ntool: read_file\n```"
+        
+        assert _extract_yaml(response) == "tool: read_file"
+    
+    def test_generic_block(self):
+        """Test extracting an untagged code block."""
+        response = "```\ntool: list_dir\n```"
+        
+        assert _extract_yaml(response) == "tool: list_dir"
+    
+    def test_yaml_block_preferred_over_earlier_generic_block(self):
+        """Test that a tagged block wins over an untagged one that comes first."""
+        response = "```\nprint('hi')\n```\n```yaml\ntool: finish\n```"
+        
+        assert _extract_yaml(response) == "tool: finish"
+    
+    def test_unclosed_block(self):
+        """Test that an unterminated block runs to the end of the response."""
+        response = "```yaml\ntool: finish\nreason: done\n"
+        
+        assert _extract_yaml(response) == "tool: finish\nreason: done"
+    
+    def test_no_block(self):
+        """Test that a response without code blocks returns None."""
+        assert _extract_yaml("tool: finish") is None
@@ -0,0 +1,34 @@
+"""Tests for recording ApplyChangesNode results in the history."""
+
+from src.flow import ApplyChangesNode
+
+
+class TestApplyChangesPost:
+    """Test the history entry that ApplyChangesNode.post writes."""
+    
+    def test_success_and_message_are_recorded(self, tmp_path):
+        """Test that each operation's success flag and message land in the matching fields."""
+        (tmp_path / "app.py").write_text("one\ntwo\nthree\n")
+        shared = {
+            "working_dir": str(tmp_path),
+            "history": [{"tool": "edit_file", "params": {"target_file": "app.py"}, "result": None}],
+            "edit_operations": [
+                {"start_line": 2, "end_line": 2, "replacement": "TWO\n"},
+                {"start_line": 0, "end_line": 1, "replacement": "bad\n"},
+            ],
+            "edit_reasoning": "Uppercase line two",
+        }
+        
+        ApplyChangesNode().run(shared)
+        
+        result = shared["history"][-1]["result"]
+        assert result["success"] is False
+        assert result["operations"] == 2
+        assert result["reasoning"] == "Uppercase line two"
+        # Operations run bottom-to-top, so the invalid start_line 0 comes last
+        assert [detail["success"] for detail in result["details"]] == [True, False]
+        assert result["details"][0]["message"].startswith("Successfully replaced lines 2 to 2")
+        assert result["details"][1]["message"] == "Error: start_line must be at least 1"
+        assert (tmp_path / "app.py").read_text() == "one\nTWO\nthree\n"
+        assert "edit_operations" not in shared
+        assert "edit_reasoning" not in shared
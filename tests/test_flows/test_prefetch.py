@@ -0,0 +1,59 @@
+"""Tests for prefetching the likely next file read in MainDecisionAgent."""
+
+import os
+import pytest
+from src import flow
+from src.flow import MainDecisionAgent, _last_touched_file
+from src.utils import read_file as read_file_module
+from src.utils.llm_cache import clear_llm_cache
+
+
+class TestLastTouchedFile:
+    """Test predicting the file the next action will read."""
+    
+    def test_no_history(self):
+        """Test that nothing is predicted without history."""
+        assert _last_touched_file({"history": []}) is None
+        assert _last_touched_file({}) is None
+    
+    def test_most_recent_read_or_edit_wins(self):
+        """Test that the latest read_file or edit_file target is used, skipping other tools."""
+        shared = {
+            "working_dir": "project",
+            "history": [
+                {"tool": "read_file", "params": {"target_file": "a.py"}},
+                {"tool": "edit_file", "params": {"target_file": "b.py"}},
+                {"tool": "grep_search", "params": {"query": "foo"}},
+            ],
+        }
+        
+        assert _last_touched_file(shared) == os.path.join("project", "b.py")
+
+
+class TestMainDecisionPrefetch:
+    """Test that MainDecisionAgent warms the read_file cache during the LLM call."""
+    
+    @pytest.fixture(autouse=True)
+    def clear_caches(self):
+        """Start every test with empty LLM and read caches."""
+        clear_llm_cache()
+        read_file_module._line_cache.clear()
+        yield
+        clear_llm_cache()
+        read_file_module._line_cache.clear()
+    
+    def test_predicted_file_is_cached(self, tmp_path, monkeypatch):
+        """Test that the last touched file is read into the cache before exec returns."""
+        (tmp_path / "main.py").write_text("print('hi')\n")
+        shared = {
+            "user_query": "Fix main.py",
+            "working_dir": str(tmp_path),
+            "history": [{"tool": "read_file", "reason": "look", "params": {"target_file": "main.py"}}],
+        }
+        monkeypatch.setattr(flow, "call_llm", lambda prompt: "```yaml\ntool: finish\nreason: done\n```")
+        
+        node = MainDecisionAgent()
+        decision = node.exec(node.prep(shared))
+        
+        assert decision["tool"] == "finish"
+        assert os.path.abspath(str(tmp_path / "main.py")) in read_file_module._line_cache
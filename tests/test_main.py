@@ -0,0 +1,56 @@
+"""Tests for the logging setup in src.main."""
+
+import contextlib
+import logging
+from src.main import setup_logging
+
+
+@contextlib.contextmanager
+def bare_root_logger():
+    """
+    Temporarily empty the root logger's handlers so basicConfig installs its own.
+    
+    pytest adds its capture handlers when the test body starts, so this has to run
+    inside the test rather than in a fixture. The list is restored in place so
+    pytest can still remove its handlers afterwards.
+    """
+    root = logging.getLogger()
+    saved_handlers = root.handlers[:]
+    saved_levels = {name: logging.getLogger(name).level for name in ("", "httpx")}
+    root.handlers.clear()
+    try:
+        yield
+    finally:
+        root.handlers[:] = saved_handlers
+        for name, level in saved_levels.items():
+            logging.getLogger(name).setLevel(level)
+
+
+class TestSetupLogging:
+    """Test that log records travel through the queue listener to the log file."""
+    
+    def test_records_reach_file_after_flush(self, tmp_path, monkeypatch):
+        """Test that file records are buffered until the memory handler is flushed."""
+        monkeypatch.chdir(tmp_path)
+        log_file = tmp_path / "coding_agent.log"
+        
+        with bare_root_logger():
+            listener = setup_logging()
+            try:
+                logging.getLogger("test_main").info("queued record")
+            finally:
+                # Stopping the listener drains the queue into its handlers
+                listener.stop()
+        file_handler = listener.handlers[1]
+        target = file_handler.target
+        
+        try:
+            # Fewer than 128 INFO records stay in the buffer
+            assert "queued record" not in log_file.read_text()
+            
+            file_handler.flush()
+            
+            assert "test_main - INFO - queued record" in log_file.read_text()
+        finally:
+            file_handler.close()
+            target.close()
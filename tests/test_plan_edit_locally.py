@@ -0,0 +1,81 @@
+"""Tests for the _plan_edit_locally helper."""
+
+import pytest
+from src.flow import _plan_edit_locally
+
+
+FILE_CONTENT = (
+    "1: import os\n"
+    "2: \n"
+    "3: def greet(name):\n"
+    "4:     return f'Hello {name}'\n"
+    "5: \n"
+    "6: def main():\n"
+    "7:     print(greet('world'))\n"
+)
+
+
+class TestPlanEditLocally:
+    """Test planning edit operations without the LLM."""
+    
+    def test_edit_without_markers(self):
+        """Test that an edit anchored on unique first and last lines replaces that range."""
+        code_edit = "def greet(name):\n    name = name.title()\n    return f'Hello {name}'\n"
+        
+        operations = _plan_edit_locally(FILE_CONTENT, code_edit)
+        
+        assert operations == [
+            {"start_line": 3, "end_line": 4, "replacement": code_edit}
+        ]
+    
+    def test_full_file_replacement_needs_llm(self):
+        """Test that a rewrite leaving out lines without a marker is not applied locally."""
+        # greet() is not in the edit; replacing lines 1-7 with it would delete greet()
+        code_edit = "import os\nimport sys\n\ndef main():\n    print(greet('world'))"
+        
+        assert _plan_edit_locally(FILE_CONTENT, code_edit) is None
+    
+    def test_single_marker(self):
+        """Test that the chunks on both sides of a marker are planned separately."""
+        code_edit = (
+            "import os\nimport sys\n\ndef greet(name):\n"
+            "# ... existing code ...\n"
+            "def main():\n    print(greet('there'))\n    print(greet('world'))\n"
+        )
+        
+        operations = _plan_edit_locally(FILE_CONTENT, code_edit)
+        
+        assert operations == [
+            {"start_line": 1, "end_line": 3, "replacement": "import os\nimport sys\n\ndef greet(name):\n"},
+            {"start_line": 6, "end_line": 7, "replacement": "def main():\n    print(greet('there'))\n    print(greet('world'))\n"},
+        ]
+    
+    def test_indented_marker_at_start(self):
+        """Test that a leading marker leaves only the chunk after it."""
+        code_edit = "    // ... existing code ...\ndef main():\n    print(greet('there'))\n    print(greet('world'))\n"
+        
+        operations = _plan_edit_locally(FILE_CONTENT, code_edit)
+        
+        assert operations == [
+            {"start_line": 6, "end_line": 7, "replacement": "def main():\n    print(greet('there'))\n    print(greet('world'))\n"}
+        ]
+    
+    @pytest.mark.parametrize(
+        "code_edit",
+        [
+            pytest.param("def extra():\n    pass\n", id="append"),
+            pytest.param("def greet(name):\n    return f'Hi {name}'\n", id="changed_last_line"),
+            pytest.param(
+                "import os\n# ... existing code ...\ndef main():\n# ... existing code ...\n", id="two_markers"
+            ),
+            pytest.param("import os  # ... existing code ...\ndef main():\n", id="embedded_marker"),
+            pytest.param("def main():\n# ... existing code ...\nimport os\n", id="anchors_out_of_order"),
+            pytest.param("def greet(name):\n\ndef main():\n", id="drops_middle_lines"),
+            pytest.param(
+                "def greet(name):\n    return f'Hey {name}'\n\ndef main():\n", id="changes_middle_line"
+            ),
+        ],
+    )
+    def test_ambiguous_edits_need_llm(self, code_edit):
+        """Test that edits that can't be placed by string matching return None."""
+        assert _plan_edit_locally(FILE_CONTENT, code_edit) is None
@@ -5,6 +5,7 @@ import os
 from pathlib import Path
 
 
+@pytest.mark.smoke
 def test_framework_setup():
     """Test that the testing framework is properly configured."""
     assert True
@@ -41,27 +42,36 @@ def test_mock_llm_fixture(mock_llm_response):
         pytest.skip("Utils not available yet - expected during framework setup")
 
 
-def test_project_structure():
-    """Test that the project structure is as expected."""
+@pytest.fixture(scope="session")
+def project_layout():
+    """Check the expected project files and directories once per session."""
     project_root = Path(__file__).parent.parent
     
-    # Check main files exist
-    assert (project_root / "src" / "main.py").exists()
-    assert (project_root / "src" / "flow.py").exists()
-    assert (project_root / "requirements.txt").exists()
+    # One directory listing per parent instead of a stat() per path
+    entries = {}
+    for parent in ("", "src", "tests"):
+        with os.scandir(project_root / parent) as it:
+            for entry in it:
+                entries[f"{parent}/{entry.name}".lstrip("/")] = entry.is_dir()
     
-    # Check utils directory exists
-    assert (project_root / "src" / "utils").is_dir()
+    files = ("src/main.py", "src/flow.py", "requirements.txt", "tests/conftest.py", "pytest.ini")
+    dirs = ("src/utils", "tests")
     
-    # Check test structure
-    assert (project_root / "tests").is_dir()
-    assert (project_root / "tests" / "conftest.py").exists()
-    assert (project_root / "pytest.ini").exists()
+    layout = {path: path in entries for path in files}
+    layout.update({path: entries.get(path, False) for path in dirs})
+    return layout
+
+
+def test_project_structure(project_layout):
+    """Test that the project structure is as expected."""
+    missing = [path for path, present in project_layout.items() if not present]
+    assert missing == []
 
 
 class TestClassBasedTests:
     """Test class-based test organization."""
     
+    @pytest.mark.smoke
     def test_class_method(self):
         """Test that class-based tests work."""
         assert hasattr(self, 'test_class_method')
@@ -2,30 +2,62 @@
 
 import pytest
 import os
-import tempfile
+import sys
+import uuid
 from pathlib import Path
 from src.utils.delete_file import delete_file
 
 
+# A read-only directory does not stop root from deleting, and Windows ignores the mode
+_WRITE_PERMISSION_ENFORCED = sys.platform != "win32" and not (hasattr(os, "geteuid") and os.geteuid() == 0)
+
+# (file name, size in bytes, mode to chmod to or None)
+DELETE_VARIANT_CASES = [
+    pytest.param("test_file_ñiño_世界.txt", 20, None, id="unicode_name"),
+    pytest.param("file with spaces.txt", 24, None, id="spaces_in_name"),
+    pytest.param("empty.txt", 0, None, id="empty"),
+    pytest.param("large.txt", 200_000, None, id="large"),
+    pytest.param("readonly.txt", 22, 0o444, id="readonly"),
+]
+
+
+@pytest.fixture(scope="session")
+def _tmp_root(tmp_path_factory):
+    """Shared directory for the files these tests create; pytest removes it."""
+    return tmp_path_factory.mktemp("del")
+
+
+@pytest.fixture(scope="module")
+def readonly_dir(tmp_path_factory):
+    """
+    Directory holding protected.txt, made read-only once per module.
+    
+    Mode 0o555 keeps the directory searchable, so the file can still be found
+    but not removed.
+    """
+    directory = tmp_path_factory.mktemp("ro")
+    (directory / "protected.txt").write_text("Test content")
+    try:
+        os.chmod(directory, 0o555)
+    except OSError:
+        pytest.skip("Cannot test permission denied on this system")
+    yield directory
+    # Restore permissions so pytest can clean up
+    os.chmod(directory, 0o755)
+
+
 class TestDeleteFile:
     """Test the delete_file function with various scenarios."""
     
     @pytest.fixture
-    def temp_file(self):
-        """Create a temporary file for testing."""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
-            f.write("Test content for deletion")
-            f.flush()
-            yield f.name
-        # Cleanup in case test doesn't delete the file
-        if os.path.exists(f.name):
-            os.unlink(f.name)
+    def temp_file(self, _tmp_root):
+        """Create a uniquely named file for testing."""
+        path = _tmp_root / f"f_{uuid.uuid4().hex}"
+        path.write_bytes(b"Test content for deletion")
+        return str(path)
     
     def test_delete_existing_file(self, temp_file):
         """Test deleting an existing file."""
-        # Verify file exists
-        assert os.path.exists(temp_file)
-        
         # Delete the file
         message, success = delete_file(temp_file)
         
@@ -35,13 +67,10 @@ class TestDeleteFile:
         assert temp_file in message
         assert not os.path.exists(temp_file)
     
-    def test_delete_nonexistent_file(self):
+    def test_delete_nonexistent_file(self, _tmp_root):
         """Test deleting a file that doesn't exist."""
-        nonexistent_file = "/tmp/nonexistent_file_xyz.txt"
-        
-        # Ensure file doesn't exist
-        if os.path.exists(nonexistent_file):
-            os.unlink(nonexistent_file)
+        # Nothing in the shared root uses this name, so no cleanup is needed first
+        nonexistent_file = str(_tmp_root / "nonexistent_file_xyz.txt")
         
         message, success = delete_file(nonexistent_file)
         
@@ -49,288 +78,93 @@ class TestDeleteFile:
         assert "does not exist" in message
         assert nonexistent_file in message
     
-    def test_delete_directory_fails(self):
+    def test_delete_directory_fails(self, tmp_path):
         """Test that attempting to delete a directory fails appropriately."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            message, success = delete_file(temp_dir)
-            
-            assert success is False
-            assert "Error deleting file" in message
-            # Directory should still exist
-            assert os.path.exists(temp_dir)
-    
-    def test_delete_file_permission_denied(self):
-        """Test deleting a file with no write permissions."""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
-            f.write("Test content")
-            f.flush()
-            temp_file = f.name
-        
-        try:
-            # Remove write permissions from parent directory
-            parent_dir = os.path.dirname(temp_file)
-            original_mode = os.stat(parent_dir).st_mode
-            
-            # Skip if we can't change permissions on /tmp
-            if parent_dir.startswith('/tmp'):
-                pytest.skip("Cannot test permission denied on /tmp")
-            
-            try:
-                os.chmod(parent_dir, 0o444)  # Read-only
-                
-                message, success = delete_file(temp_file)
-                
-                # Should fail due to permissions
-                assert success is False
-                assert "Error deleting file" in message
-                
-            except (OSError, PermissionError):
-                # If we can't change permissions, skip this test
-                pytest.skip("Cannot test permission denied on this system")
-            finally:
-                # Restore permissions
-                os.chmod(parent_dir, original_mode)
-                
-        finally:
-            # Cleanup
-            if os.path.exists(temp_file):
-                os.unlink(temp_file)
-    
-    def test_delete_file_with_unicode_name(self):
-        """Test deleting a file with unicode characters in name."""
-        unicode_filename = "test_file_ñiño_世界.txt"
+        message, success = delete_file(str(tmp_path))
         
-        with tempfile.TemporaryDirectory() as temp_dir:
-            unicode_file = os.path.join(temp_dir, unicode_filename)
-            
-            # Create file with unicode name
-            with open(unicode_file, 'w', encoding='utf-8') as f:
-                f.write("Unicode test content")
-            
-            # Verify file exists
-            assert os.path.exists(unicode_file)
-            
-            # Delete the file
-            message, success = delete_file(unicode_file)
-            
-            # Verify successful deletion
-            assert success is True
-            assert "Successfully deleted" in message
-            assert not os.path.exists(unicode_file)
-    
-    def test_delete_file_with_spaces_in_name(self):
-        """Test deleting a file with spaces in the name."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            spaced_file = os.path.join(temp_dir, "file with spaces.txt")
-            
-            # Create file with spaces in name
-            with open(spaced_file, 'w') as f:
-                f.write("File with spaces content")
-            
-            # Verify file exists
-            assert os.path.exists(spaced_file)
-            
-            # Delete the file
-            message, success = delete_file(spaced_file)
-            
-            # Verify successful deletion
-            assert success is True
-            assert "Successfully deleted" in message
-            assert not os.path.exists(spaced_file)
+        assert success is False
+        assert "Error deleting file" in message
+        # Directory should still exist
+        assert tmp_path.exists()
     
-    def test_delete_large_file(self):
-        """Test deleting a large file."""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
-            # Write a large amount of data
-            for i in range(10000):
-                f.write(f"Line {i}: This is a test line with some content.\n")
-            f.flush()
-            large_file = f.name
+    @pytest.mark.skipif(not _WRITE_PERMISSION_ENFORCED, reason="chmod does not deny deletes on this platform")
+    def test_delete_file_permission_denied(self, readonly_dir):
+        """Test deleting a file whose directory has no write permission."""
+        message, success = delete_file(str(readonly_dir / "protected.txt"))
         
-        try:
-            # Verify file exists and is large
-            assert os.path.exists(large_file)
-            assert os.path.getsize(large_file) > 100000  # > 100KB
-            
-            # Delete the file
-            message, success = delete_file(large_file)
-            
-            # Verify successful deletion
-            assert success is True
-            assert "Successfully deleted" in message
-            assert not os.path.exists(large_file)
-            
-        finally:
-            # Cleanup in case deletion failed
-            if os.path.exists(large_file):
-                os.unlink(large_file)
+        # Should fail due to permissions
+        assert success is False
+        assert "Error deleting file" in message
     
-    def test_delete_empty_file(self):
-        """Test deleting an empty file."""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
-            # Don't write anything, file will be empty
-            f.flush()
-            empty_file = f.name
+    @pytest.mark.parametrize("name,size,mode", DELETE_VARIANT_CASES)
+    def test_delete_file_variants(self, tmp_path, name, size, mode):
+        """Test deleting files with unusual names, sizes and permissions."""
+        path = tmp_path / name
+        # Contents don't matter for deletion; a sparse file has the logical size in one call
+        with open(path, "wb") as f:
+            f.truncate(size)
+        if mode is not None:
+            try:
+                path.chmod(mode)
+            except OSError:
+                pytest.skip("Cannot change file permissions on this system")
+        abs_path = os.path.abspath(path)
         
-        try:
-            # Verify file exists and is empty
-            assert os.path.exists(empty_file)
-            assert os.path.getsize(empty_file) == 0
-            
-            # Delete the file
-            message, success = delete_file(empty_file)
-            
-            # Verify successful deletion
-            assert success is True
-            assert "Successfully deleted" in message
-            assert not os.path.exists(empty_file)
-            
-        finally:
-            # Cleanup in case deletion failed
-            if os.path.exists(empty_file):
-                os.unlink(empty_file)
-    
-    def test_delete_readonly_file(self):
-        """Test deleting a read-only file."""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
-            f.write("Read-only file content")
-            f.flush()
-            readonly_file = f.name
+        # One stat checks both that the file exists and its size
+        assert os.stat(abs_path).st_size == size
         
-        try:
-            # Make file read-only
-            os.chmod(readonly_file, 0o444)
-            
-            # Verify file exists and is read-only
-            assert os.path.exists(readonly_file)
-            
-            # Delete the file (should still work)
-            message, success = delete_file(readonly_file)
-            
-            # Verify successful deletion (os.remove should work on read-only files)
-            assert success is True
-            assert "Successfully deleted" in message
-            assert not os.path.exists(readonly_file)
-            
-        except OSError:
-            # If we can't change permissions, clean up and skip
-            if os.path.exists(readonly_file):
-                os.chmod(readonly_file, 0o644)
-                os.unlink(readonly_file)
-            pytest.skip("Cannot test read-only file on this system")
-    
-    def test_delete_file_absolute_path(self):
-        """Test deleting a file using absolute path."""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
-            f.write("Absolute path test")
-            f.flush()
-            temp_file = f.name
+        message, success = delete_file(abs_path)
         
-        try:
-            # Get absolute path
-            abs_path = os.path.abspath(temp_file)
-            
-            # Verify file exists
-            assert os.path.exists(abs_path)
-            
-            # Delete using absolute path
-            message, success = delete_file(abs_path)
-            
-            # Verify successful deletion
-            assert success is True
-            assert "Successfully deleted" in message
-            assert abs_path in message
-            assert not os.path.exists(abs_path)
-            
-        finally:
-            # Cleanup in case deletion failed
-            if os.path.exists(temp_file):
-                os.unlink(temp_file)
+        # Verify successful deletion (os.remove works on read-only files too)
+        assert success is True
+        assert message.startswith("Successfully deleted")
+        assert abs_path in message
+        assert not path.exists()
     
-    def test_delete_file_relative_path(self, temp_file):
+    def test_delete_file_relative_path(self, temp_file, tmp_path, monkeypatch):
         """Test deleting a file using relative path."""
-        # Create a symlink in current directory for testing
+        # Create the symlink in an isolated working directory
+        monkeypatch.chdir(tmp_path)
         relative_name = "test_relative_delete.txt"
-        if os.path.exists(relative_name):
-            os.unlink(relative_name)
+        Path(relative_name).symlink_to(temp_file)
         
-        try:
-            os.symlink(temp_file, relative_name)
-            
-            # Verify symlink exists
-            assert os.path.exists(relative_name)
-            
-            # Delete using relative path
-            message, success = delete_file(relative_name)
-            
-            # Verify successful deletion of symlink
-            assert success is True
-            assert "Successfully deleted" in message
-            assert not os.path.exists(relative_name)
-            
-            # Original file should still exist
-            assert os.path.exists(temp_file)
-            
-        finally:
-            if os.path.exists(relative_name):
-                os.unlink(relative_name)
-    
-    def test_delete_multiple_files_sequentially(self):
-        """Test deleting multiple files in sequence."""
-        temp_files = []
+        # Delete using relative path
+        message, success = delete_file(relative_name)
         
-        try:
-            # Create multiple temporary files
-            for i in range(5):
-                with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
-                    f.write(f"Content for file {i}")
-                    f.flush()
-                    temp_files.append(f.name)
-            
-            # Verify all files exist
-            for temp_file in temp_files:
-                assert os.path.exists(temp_file)
-            
-            # Delete all files
-            for temp_file in temp_files:
-                message, success = delete_file(temp_file)
-                assert success is True
-                assert "Successfully deleted" in message
-                assert not os.path.exists(temp_file)
-            
-        finally:
-            # Cleanup any remaining files
-            for temp_file in temp_files:
-                if os.path.exists(temp_file):
-                    os.unlink(temp_file)
-    
-    def test_return_value_format(self, temp_file):
-        """Test that return values are properly formatted."""
-        message, success = delete_file(temp_file)
+        # Verify successful deletion of symlink
+        assert success is True
+        assert "Successfully deleted" in message
+        assert not os.path.lexists(relative_name)
         
-        # Check return types
-        assert isinstance(message, str)
-        assert isinstance(success, bool)
+        # Original file should still exist
+        assert os.path.exists(temp_file)
+    
+    @pytest.mark.parametrize("index", range(5))
+    def test_delete_one_of_several_files(self, tmp_path, index):
+        """Test that deleting one file in a directory leaves its siblings alone."""
+        paths = [tmp_path / f"file_{i}.txt" for i in range(5)]
+        for i, path in enumerate(paths):
+            path.write_text(f"Content for file {i}")
         
-        # Check message format
-        assert len(message) > 0
-        assert temp_file in message
+        message, success = delete_file(str(paths[index]))
         
-        # For successful deletion
         assert success is True
-        assert message.startswith("Successfully deleted")
+        assert "Successfully deleted" in message
+        assert [path.exists() for path in paths] == [i != index for i in range(5)]
     
-    def test_error_message_format(self):
-        """Test error message formatting."""
-        nonexistent_file = "/tmp/definitely_nonexistent_file.txt"
-        
-        message, success = delete_file(nonexistent_file)
-        
-        # Check return types
-        assert isinstance(message, str)
-        assert isinstance(success, bool)
-        
-        # Check error format
-        assert success is False
-        assert len(message) > 0
-        assert nonexistent_file in message
\ No newline at end of file
+    @pytest.mark.parametrize(
+        "create,expected_success",
+        [pytest.param(True, True, id="deleted"), pytest.param(False, False, id="missing")],
+    )
+    def test_return_contract(self, tmp_path, create, expected_success):
+        """Test that delete_file returns a (message, success) tuple that names the path."""
+        path = tmp_path / "target.txt"
+        if create:
+            path.write_text("Test content")
+        
+        message, success = delete_file(str(path))
+        
+        assert type(message) is str
+        assert type(success) is bool
+        assert success is expected_success
+        assert str(path) in message
@@ -2,182 +2,159 @@
 
 import pytest
 import os
-import tempfile
+from pathlib import Path
 from src.utils.remove_file import remove_file
 from src.utils.insert_file import insert_file
-from src.utils.replace_file import replace_file
+from src.utils.replace_file import replace_file, replace_file_batch
+
+
+def read_lines(path):
+    """Return the lines of a file, keeping line endings like readlines()."""
+    return Path(path).read_text().splitlines(keepends=True)
+
+
+def assert_succeeded(result, *needles):
+    """Assert that a (message, success) result succeeded and its message contains every needle."""
+    message, success = result
+    assert success is True, message
+    for needle in needles:
+        assert needle in message, message
+
+
+def assert_failed(result, *needles):
+    """Assert that a (message, success) result failed and its message contains every needle."""
+    message, success = result
+    assert success is False, message
+    for needle in needles:
+        assert needle in message, message
+
+
+# Sample file contents, formatted once at import and written with a single call per test
+NUMBERED_SAMPLE_BYTES = "".join(f"Line {i}: This is line number {i}\n" for i in range(1, 11)).encode()
+SHORT_SAMPLE_BYTES = b"Line 1\nLine 2\nLine 3\n"
+ORIGINAL_SAMPLE_BYTES = "".join(f"Line {i}: Original content\n" for i in range(1, 11)).encode()
+
+
+@pytest.fixture
+def sample_file(request, tmp_path):
+    """Create a file holding the requesting test class's SAMPLE_BYTES."""
+    path = tmp_path / "sample.txt"
+    path.write_bytes(request.cls.SAMPLE_BYTES)
+    return str(path)
+
+
+@pytest.fixture
+def validation_path(tmp_path):
+    """A path that is never created, for checks that fail before the file is touched."""
+    return str(tmp_path / "dummy.txt")
 
 
 class TestRemoveFile:
     """Test the remove_file function with various scenarios."""
     
-    @pytest.fixture
-    def sample_file(self):
-        """Create a temporary file with sample content."""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
-            for i in range(1, 11):
-                f.write(f"Line {i}: This is line number {i}\n")
-            f.flush()
-            yield f.name
-        # Cleanup
-        if os.path.exists(f.name):
-            os.unlink(f.name)
+    SAMPLE_BYTES = NUMBERED_SAMPLE_BYTES
     
     def test_remove_middle_lines(self, sample_file):
         """Test removing lines from the middle of the file."""
-        message, success = remove_file(sample_file, 3, 5)
-        
-        assert success is True
-        assert "Successfully removed lines 3 to 5" in message
+        assert_succeeded(remove_file(sample_file, 3, 5), "Successfully removed lines 3 to 5")
         
         # Verify content
-        with open(sample_file, 'r') as f:
-            lines = f.readlines()
+        lines = read_lines(sample_file)
         
         assert len(lines) == 7  # Originally 10, removed 3
-        assert "Line 2:" in lines[1]
-        assert "Line 6:" in lines[2]  # Line 6 should now be at index 2
+        assert lines[1].startswith("Line 2:")
+        assert lines[2].startswith("Line 6:")  # Line 6 should now be at index 2
     
     def test_remove_from_start(self, sample_file):
         """Test removing lines from start to specific line."""
-        message, success = remove_file(sample_file, None, 3)
-        
-        assert success is True
-        assert "Successfully removed lines 1 to 3" in message
+        assert_succeeded(remove_file(sample_file, None, 3), "Successfully removed lines 1 to 3")
         
         # Verify content
-        with open(sample_file, 'r') as f:
-            lines = f.readlines()
+        lines = read_lines(sample_file)
         
         assert len(lines) == 7  # Originally 10, removed 3
-        assert "Line 4:" in lines[0]  # Line 4 should now be first
+        assert lines[0].startswith("Line 4:")  # Line 4 should now be first
     
     def test_remove_to_end(self, sample_file):
         """Test removing lines from specific line to end."""
-        message, success = remove_file(sample_file, 7, None)
-        
-        assert success is True
-        assert "Successfully removed lines 7 to end" in message
+        assert_succeeded(remove_file(sample_file, 7, None), "Successfully removed lines 7 to end")
         
         # Verify content
-        with open(sample_file, 'r') as f:
-            lines = f.readlines()
+        lines = read_lines(sample_file)
         
         assert len(lines) == 6  # Originally 10, removed last 4
-        assert "Line 6:" in lines[5]  # Line 6 should be last
+        assert lines[5].startswith("Line 6:")  # Line 6 should be last
     
     def test_remove_single_line(self, sample_file):
         """Test removing a single line."""
-        message, success = remove_file(sample_file, 5, 5)
-        
-        assert success is True
-        assert "Successfully removed lines 5 to 5" in message
+        assert_succeeded(remove_file(sample_file, 5, 5), "Successfully removed lines 5 to 5")
         
         # Verify content
-        with open(sample_file, 'r') as f:
-            lines = f.readlines()
+        lines = read_lines(sample_file)
         
         assert len(lines) == 9  # Originally 10, removed 1
-        assert "Line 4:" in lines[3]
-        assert "Line 6:" in lines[4]  # Line 6 should follow Line 4
+        assert lines[3].startswith("Line 4:")
+        assert lines[4].startswith("Line 6:")  # Line 6 should follow Line 4
     
     def test_remove_beyond_file_length(self, sample_file):
         """Test removing lines beyond file length."""
-        message, success = remove_file(sample_file, 15, 20)
-        
-        assert success is True
-        assert "No lines removed" in message
-        assert "exceeds file length" in message
+        assert_succeeded(remove_file(sample_file, 15, 20), "No lines removed", "exceeds file length")
         
         # File should be unchanged
-        with open(sample_file, 'r') as f:
-            lines = f.readlines()
+        lines = read_lines(sample_file)
         assert len(lines) == 10
     
     def test_remove_invalid_parameters(self, sample_file):
         """Test with invalid parameters."""
         # No parameters
-        message, success = remove_file(sample_file)
-        assert success is False
-        assert "At least one of start_line or end_line must be specified" in message
+        assert_failed(remove_file(sample_file), "At least one of start_line or end_line must be specified")
         
         # Invalid start line
-        message, success = remove_file(sample_file, 0, 5)
-        assert success is False
-        assert "start_line must be at least 1" in message
+        assert_failed(remove_file(sample_file, 0, 5), "start_line must be at least 1")
         
         # Invalid end line
-        message, success = remove_file(sample_file, 5, 0)
-        assert success is False
-        assert "end_line must be at least 1" in message
+        assert_failed(remove_file(sample_file, 5, 0), "end_line must be at least 1")
         
         # Start > end
-        message, success = remove_file(sample_file, 8, 5)
-        assert success is False
-        assert "start_line must be less than or equal to end_line" in message
+        assert_failed(remove_file(sample_file, 8, 5), "start_line must be less than or equal to end_line")
     
     def test_remove_nonexistent_file(self):
         """Test removing from nonexistent file."""
-        message, success = remove_file("nonexistent.txt", 1, 5)
-        
-        assert success is False
-        assert "does not exist" in message
+        assert_failed(remove_file("nonexistent.txt", 1, 5), "does not exist")
 
 
 class TestInsertFile:
     """Test the insert_file function with various scenarios."""
     
-    @pytest.fixture
-    def sample_file(self):
-        """Create a temporary file with sample content."""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
-            f.write("Line 1\nLine 2\nLine 3\n")
-            f.flush()
-            yield f.name
-        # Cleanup
-        if os.path.exists(f.name):
-            os.unlink(f.name)
-    
-    def test_create_new_file(self):
+    SAMPLE_BYTES = SHORT_SAMPLE_BYTES
+    
+    def test_create_new_file(self, tmp_path):
         """Test creating a new file."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            new_file = os.path.join(temp_dir, "new_file.txt")
-            content = "This is new content\nWith multiple lines\n"
-            
-            message, success = insert_file(new_file, content)
-            
-            assert success is True
-            assert "Successfully created" in message
-            assert os.path.exists(new_file)
-            
-            with open(new_file, 'r') as f:
-                file_content = f.read()
-            assert file_content == content
+        new_file = os.path.join(tmp_path, "new_file.txt")
+        content = "This is new content\nWith multiple lines\n"
+        
+        assert_succeeded(insert_file(new_file, content), "Successfully created")
+        assert os.path.exists(new_file)
+        
+        file_content = Path(new_file).read_text()
+        assert file_content == content
     
     def test_replace_existing_file(self, sample_file):
         """Test replacing an existing file completely."""
         new_content = "Completely new content\nReplacing everything\n"
         
-        message, success = insert_file(sample_file, new_content)
-        
-        assert success is True
-        assert "Successfully replaced" in message
+        assert_succeeded(insert_file(sample_file, new_content), "Successfully replaced")
         
-        with open(sample_file, 'r') as f:
-            file_content = f.read()
+        file_content = Path(sample_file).read_text()
         assert file_content == new_content
     
     def test_insert_at_beginning(self, sample_file):
         """Test inserting at the beginning of the file."""
         insert_content = "New first line\n"
         
-        message, success = insert_file(sample_file, insert_content, line_number=1)
+        assert_succeeded(insert_file(sample_file, insert_content, line_number=1), "Successfully inserted into")
         
-        assert success is True
-        assert "Successfully inserted into" in message
-        
-        with open(sample_file, 'r') as f:
-            lines = f.readlines()
+        lines = read_lines(sample_file)
         
         assert lines[0] == "New first line\n"
         assert lines[1] == "Line 1\n"
@@ -187,13 +164,9 @@ class TestInsertFile:
         """Test inserting in the middle of the file."""
         insert_content = "Inserted line\n"
         
-        message, success = insert_file(sample_file, insert_content, line_number=2)
-        
-        assert success is True
-        assert "Successfully inserted into" in message
+        assert_succeeded(insert_file(sample_file, insert_content, line_number=2), "Successfully inserted into")
         
-        with open(sample_file, 'r') as f:
-            lines = f.readlines()
+        lines = read_lines(sample_file)
         
         assert lines[0] == "Line 1\n"
         assert lines[1] == "Inserted line\n"
@@ -204,13 +177,9 @@ class TestInsertFile:
         """Test inserting at the end of the file."""
         insert_content = "New last line\n"
         
-        message, success = insert_file(sample_file, insert_content, line_number=4)
+        assert_succeeded(insert_file(sample_file, insert_content, line_number=4), "Successfully inserted into")
         
-        assert success is True
-        assert "Successfully inserted into" in message
-        
-        with open(sample_file, 'r') as f:
-            lines = f.readlines()
+        lines = read_lines(sample_file)
         
         assert len(lines) == 4
         assert lines[3] == "New last line\n"
@@ -219,13 +188,9 @@ class TestInsertFile:
         """Test inserting beyond the end of the file."""
         insert_content = "Far beyond line\n"
         
-        message, success = insert_file(sample_file, insert_content, line_number=10)
-        
-        assert success is True
-        assert "Successfully inserted into" in message
+        assert_succeeded(insert_file(sample_file, insert_content, line_number=10), "Successfully inserted into")
         
-        with open(sample_file, 'r') as f:
-            lines = f.readlines()
+        lines = read_lines(sample_file)
         
         assert len(lines) == 10
         assert lines[9] == "Far beyond line\n"
@@ -233,195 +198,140 @@ class TestInsertFile:
         for i in range(3, 9):
             assert lines[i] == "\n"
     
-    def test_insert_invalid_line_number(self, sample_file):
+    def test_insert_invalid_line_number(self, validation_path):
         """Test inserting with invalid line number."""
-        message, success = insert_file(sample_file, "content", line_number=0)
-        
-        assert success is False
-        assert "Line number must be at least 1" in message
+        assert_failed(insert_file(validation_path, "content", line_number=0), "Line number must be at least 1")
+        assert not os.path.exists(validation_path)
     
-    def test_insert_create_directories(self):
+    def test_insert_create_directories(self, tmp_path):
         """Test that directories are created if they don't exist."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            nested_file = os.path.join(temp_dir, "subdir", "nested", "file.txt")
-            content = "Content in nested file\n"
-            
-            message, success = insert_file(nested_file, content)
-            
-            assert success is True
-            assert "Successfully created" in message
-            assert os.path.exists(nested_file)
-            
-            with open(nested_file, 'r') as f:
-                file_content = f.read()
-            assert file_content == content
-    
-    def test_insert_into_nonexistent_file_with_line_number(self):
+        nested_file = os.path.join(tmp_path, "subdir", "nested", "file.txt")
+        content = "Content in nested file\n"
+        
+        assert_succeeded(insert_file(nested_file, content), "Successfully created")
+        assert os.path.exists(nested_file)
+        
+        file_content = Path(nested_file).read_text()
+        assert file_content == content
+    
+    def test_insert_into_nonexistent_file_with_line_number(self, tmp_path):
         """Test inserting into nonexistent file with specific line number."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            new_file = os.path.join(temp_dir, "new_file.txt")
-            content = "Content at line 3\n"
-            
-            message, success = insert_file(new_file, content, line_number=3)
-            
-            assert success is True
-            assert "Successfully created and inserted into" in message
-            
-            with open(new_file, 'r') as f:
-                lines = f.readlines()
-            
-            assert len(lines) == 2  # The implementation creates fewer empty lines
-            assert lines[0] == "\n"  # Empty lines before insertion (newline character)
-            assert lines[1] == "Content at line 3\n"
+        new_file = os.path.join(tmp_path, "new_file.txt")
+        content = "Content at line 3\n"
+        
+        assert_succeeded(insert_file(new_file, content, line_number=3), "Successfully created and inserted into")
+        
+        lines = read_lines(new_file)
+        
+        assert len(lines) == 2  # The implementation creates fewer empty lines
+        assert lines[0] == "\n"  # Empty lines before insertion (newline character)
+        assert lines[1] == "Content at line 3\n"
 
 
 class TestReplaceFile:
     """Test the replace_file function with various scenarios."""
     
-    @pytest.fixture
-    def sample_file(self):
-        """Create a temporary file with sample content."""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
-            for i in range(1, 11):
-                f.write(f"Line {i}: Original content\n")
-            f.flush()
-            yield f.name
-        # Cleanup
-        if os.path.exists(f.name):
-            os.unlink(f.name)
+    SAMPLE_BYTES = ORIGINAL_SAMPLE_BYTES
     
     def test_replace_middle_lines(self, sample_file):
         """Test replacing lines in the middle of the file."""
         new_content = "New line 3\nNew line 4\nNew line 5\n"
         
-        message, success = replace_file(sample_file, 3, 5, new_content)
+        assert_succeeded(replace_file(sample_file, 3, 5, new_content), "Successfully replaced lines 3 to 5")
         
-        assert success is True
-        assert "Successfully replaced lines 3 to 5" in message
-        
-        with open(sample_file, 'r') as f:
-            lines = f.readlines()
+        lines = read_lines(sample_file)
         
         assert len(lines) == 10  # Same length (replaced 3 with 3)
-        assert "Line 2:" in lines[1]
+        assert lines[1].startswith("Line 2:")
         assert lines[2] == "New line 3\n"
         assert lines[3] == "New line 4\n"
         assert lines[4] == "New line 5\n"
-        assert "Line 6:" in lines[5]
+        assert lines[5].startswith("Line 6:")
     
     def test_replace_with_different_line_count(self, sample_file):
         """Test replacing with different number of lines."""
         new_content = "Single replacement line\n"
         
-        message, success = replace_file(sample_file, 7, 9, new_content)
-        
-        assert success is True
-        assert "Successfully replaced lines 7 to 9" in message
+        assert_succeeded(replace_file(sample_file, 7, 9, new_content), "Successfully replaced lines 7 to 9")
         
-        with open(sample_file, 'r') as f:
-            lines = f.readlines()
+        lines = read_lines(sample_file)
         
         assert len(lines) == 8  # Originally 10, removed 3, added 1
-        assert "Line 6:" in lines[5]
+        assert lines[5].startswith("Line 6:")
         assert lines[6] == "Single replacement line\n"
-        assert "Line 10:" in lines[7]
+        assert lines[7].startswith("Line 10:")
     
     def test_replace_single_line(self, sample_file):
         """Test replacing a single line."""
         new_content = "Replaced single line\n"
         
-        message, success = replace_file(sample_file, 5, 5, new_content)
-        
-        assert success is True
-        assert "Successfully replaced lines 5 to 5" in message
+        assert_succeeded(replace_file(sample_file, 5, 5, new_content), "Successfully replaced lines 5 to 5")
         
-        with open(sample_file, 'r') as f:
-            lines = f.readlines()
+        lines = read_lines(sample_file)
         
         assert len(lines) == 10
-        assert "Line 4:" in lines[3]
+        assert lines[3].startswith("Line 4:")
         assert lines[4] == "Replaced single line\n"
-        assert "Line 6:" in lines[5]
+        assert lines[5].startswith("Line 6:")
     
     def test_replace_invalid_parameters(self, sample_file):
         """Test replace with invalid parameters."""
         # Invalid start line
-        message, success = replace_file(sample_file, 0, 5, "content")
-        assert success is False
-        assert "start_line must be at least 1" in message
+        assert_failed(replace_file(sample_file, 0, 5, "content"), "start_line must be at least 1")
         
         # Invalid end line
-        message, success = replace_file(sample_file, 5, 0, "content")
-        assert success is False
-        assert "end_line must be at least 1" in message
+        assert_failed(replace_file(sample_file, 5, 0, "content"), "end_line must be at least 1")
         
         # Start > end
-        message, success = replace_file(sample_file, 8, 5, "content")
-        assert success is False
-        assert "start_line must be less than or equal to end_line" in message
+        assert_failed(replace_file(sample_file, 8, 5, "content"), "start_line must be less than or equal to end_line")
     
     def test_replace_nonexistent_file(self):
         """Test replacing in nonexistent file."""
-        message, success = replace_file("nonexistent.txt", 1, 3, "content")
-        
-        assert success is False
-        assert "does not exist" in message
+        assert_failed(replace_file("nonexistent.txt", 1, 3, "content"), "does not exist")
     
     def test_replace_with_empty_content(self, sample_file):
         """Test replacing with empty content."""
         new_content = ""
         
-        message, success = replace_file(sample_file, 3, 5, new_content)
-        
-        assert success is True
+        assert_succeeded(replace_file(sample_file, 3, 5, new_content))
         
-        with open(sample_file, 'r') as f:
-            lines = f.readlines()
+        lines = read_lines(sample_file)
         
         assert len(lines) == 7  # Originally 10, removed 3, added 0
-        assert "Line 2:" in lines[1]
-        assert "Line 6:" in lines[2]
+        assert lines[1].startswith("Line 2:")
+        assert lines[2].startswith("Line 6:")
     
     def test_replace_first_lines(self, sample_file):
         """Test replacing lines at the beginning."""
         new_content = "New first line\nNew second line\n"
         
-        message, success = replace_file(sample_file, 1, 2, new_content)
+        assert_succeeded(replace_file(sample_file, 1, 2, new_content))
         
-        assert success is True
-        
-        with open(sample_file, 'r') as f:
-            lines = f.readlines()
+        lines = read_lines(sample_file)
         
         assert lines[0] == "New first line\n"
         assert lines[1] == "New second line\n"
-        assert "Line 3:" in lines[2]
+        assert lines[2].startswith("Line 3:")
     
     def test_replace_last_lines(self, sample_file):
         """Test replacing lines at the end."""
         new_content = "New last line\n"
         
-        message, success = replace_file(sample_file, 9, 10, new_content)
-        
-        assert success is True
+        assert_succeeded(replace_file(sample_file, 9, 10, new_content))
         
-        with open(sample_file, 'r') as f:
-            lines = f.readlines()
+        lines = read_lines(sample_file)
         
         assert len(lines) == 9  # Originally 10, removed 2, added 1
-        assert "Line 8:" in lines[7]
+        assert lines[7].startswith("Line 8:")
         assert lines[8] == "New last line\n"
     
     def test_replace_entire_file(self, sample_file):
         """Test replacing the entire file content."""
         new_content = "Completely new content\nWith multiple lines\nReplacing everything\n"
         
-        message, success = replace_file(sample_file, 1, 10, new_content)
+        assert_succeeded(replace_file(sample_file, 1, 10, new_content))
         
-        assert success is True
-        
-        with open(sample_file, 'r') as f:
-            content = f.read()
+        content = Path(sample_file).read_text()
         
         assert content == new_content
     
@@ -430,16 +340,77 @@ class TestReplaceFile:
         # This test verifies the integration works as expected
         new_content = "Integration test content\n"
         
-        message, success = replace_file(sample_file, 5, 7, new_content)
-        
-        assert success is True
-        assert "Successfully replaced lines 5 to 7" in message
+        assert_succeeded(replace_file(sample_file, 5, 7, new_content), "Successfully replaced lines 5 to 7")
         
-        with open(sample_file, 'r') as f:
-            lines = f.readlines()
+        lines = read_lines(sample_file)
         
         # Should have 8 lines total (10 - 3 + 1)
         assert len(lines) == 8
-        assert "Line 4:" in lines[3]
+        assert lines[3].startswith("Line 4:")
         assert lines[4] == "Integration test content\n"
-        assert "Line 8:" in lines[5]
\ No newline at end of file
+        assert lines[5].startswith("Line 8:")
+
+
+class TestReplaceFileBatch:
+    """Test the replace_file_batch function with various scenarios."""
+    
+    SAMPLE_BYTES = ORIGINAL_SAMPLE_BYTES
+    
+    def test_multiple_operations_bottom_to_top(self, sample_file):
+        """Test applying several sorted operations in one pass."""
+        operations = [
+            (8, 9, "New line 8\n"),
+            (2, 3, "New line 2\nNew line 2b\nNew line 2c\n"),
+        ]
+        
+        results = replace_file_batch(sample_file, operations)
+        
+        assert [success for _, success in results] == [True, True]
+        assert "Successfully replaced lines 8 to 9" in results[0][0]
+        assert "Successfully replaced lines 2 to 3" in results[1][0]
+        
+        lines = read_lines(sample_file)
+        
+        assert len(lines) == 10  # 10 - 2 + 1 - 2 + 3
+        assert lines[0].startswith("Line 1:")
+        assert lines[1:4] == ["New line 2\n", "New line 2b\n", "New line 2c\n"]
+        assert lines[4].startswith("Line 4:")
+        assert lines[7].startswith("Line 7:")
+        assert lines[8] == "New line 8\n"
+        assert lines[9].startswith("Line 10:")
+    
+    def test_matches_sequential_replace_file(self, sample_file):
+        """Test that the batch result equals applying replace_file one by one."""
+        operations = [(10, 12, "Tail"), (5, 5, ""), (1, 1, "Head\nMore\n")]
+        original = Path(sample_file).read_text()
+        
+        batch_results = replace_file_batch(sample_file, operations)
+        batch_content = Path(sample_file).read_text()
+        
+        Path(sample_file).write_text(original)
+        sequential_results = [replace_file(sample_file, *op) for op in operations]
+        sequential_content = Path(sample_file).read_text()
+        
+        assert batch_content == sequential_content
+        assert batch_results == sequential_results
+    
+    def test_invalid_operation_is_skipped(self, sample_file):
+        """Test that an invalid operation fails without blocking the others."""
+        results = replace_file_batch(sample_file, [(8, 5, "content"), (2, 2, "Replaced\n")])
+        
+        assert results[0][1] is False
+        assert "start_line must be less than or equal to end_line" in results[0][0]
+        assert results[1][1] is True
+        
+        lines = read_lines(sample_file)
+        
+        assert len(lines) == 10
+        assert lines[1] == "Replaced\n"
+    
+    def test_nonexistent_file(self):
+        """Test that every operation fails for a nonexistent file."""
+        results = replace_file_batch("nonexistent.txt", [(1, 1, "a"), (2, 2, "b")])
+        
+        assert len(results) == 2
+        assert all(success is False for _, success in results)
+        assert all("does not exist" in message for message, _ in results)
@@ -0,0 +1,71 @@
+"""Tests for the llm_cache utility functions."""
+
+import pytest
+from unittest.mock import Mock
+from src.utils import llm_cache
+from src.utils.llm_cache import cached_llm_call, clear_llm_cache, get_cached_response, store_response
+
+
+class TestLLMCache:
+    """Test the in-memory prompt cache."""
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        """Start and finish every test with an empty cache."""
+        clear_llm_cache()
+        yield
+        clear_llm_cache()
+
+    def test_miss_calls_llm_and_stores(self):
+        """Test that a cache miss calls the LLM and stores the response."""
+        llm = Mock(return_value="response")
+
+        result = cached_llm_call("prompt", llm)
+
+        assert result == "response"
+        llm.assert_called_once_with("prompt")
+        assert get_cached_response("prompt") == "response"
+
+    def test_hit_skips_llm(self):
+        """Test that a repeated prompt is served from the cache."""
+        llm = Mock(return_value="response")
+
+        cached_llm_call("prompt", llm)
+        result = cached_llm_call("prompt", llm)
+
+        assert result == "response"
+        llm.assert_called_once()
+
+    def test_surrounding_whitespace_and_line_endings_normalized(self):
+        """Test that prompts differing only in line endings or padding share an entry."""
+        store_response("line 1\nline 2", "cached")
+
+        assert get_cached_response("  line 1\r\nline 2\n") == "cached"
+
+    def test_case_and_indentation_are_significant(self):
+        """Test that code-relevant differences do not collide."""
+        store_response("def f():\n    pass", "cached")
+
+        assert get_cached_response("DEF F():\n    pass") is None
+        assert get_cached_response("def f():\n  pass") is None
+
+    def test_lru_eviction(self, monkeypatch):
+        """Test that the least recently used entry is evicted when full."""
+        monkeypatch.setattr(llm_cache, "MAX_ENTRIES", 2)
+
+        store_response("a", "A")
+        store_response("b", "B")
+        get_cached_response("a")  # "b" becomes least recently used
+        store_response("c", "C")
+
+        assert get_cached_response("a") == "A"
+        assert get_cached_response("b") is None
+        assert get_cached_response("c") == "C"
+
+    def test_clear_llm_cache(self):
+        """Test that clearing drops all entries."""
+        store_response("prompt", "response")
+
+        clear_llm_cache()
+
+        assert get_cached_response("prompt") is None
@@ -2,57 +2,67 @@
 
 import pytest
 import os
-import tempfile
+import sys
 from pathlib import Path
+from src.utils import read_file as read_file_module
 from src.utils.read_file import read_file
+from src.utils.replace_file import replace_file
+
+
+# 300 numbered lines, formatted once at import
+LARGE_SAMPLE_BYTES = "".join(f"Line {i}: This is line number {i}\n" for i in range(1, 301)).encode()
+
+# chmod 0o000 does not stop root from reading, and Windows ignores it
+_READ_PERMISSION_ENFORCED = sys.platform != "win32" and not (hasattr(os, "geteuid") and os.geteuid() == 0)
+
+
+@pytest.fixture(scope="session")
+def sample_bytes():
+    """Five numbered lines, built once per session."""
+    return (
+        b"Line 1: First line\n"
+        b"Line 2: Second line\n"
+        b"Line 3: Third line\n"
+        b"Line 4: Fourth line\n"
+        b"Line 5: Fifth line\n"
+    )
 
 
 class TestReadFile:
     """Test the read_file function with various scenarios."""
     
     @pytest.fixture
-    def sample_file(self):
-        """Create a temporary file with sample content."""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
-            content = """Line 1: First line
-Line 2: Second line
-Line 3: Third line
-Line 4: Fourth line
-Line 5: Fifth line
-"""
-            f.write(content)
-            f.flush()
-            yield f.name
-        # Cleanup
-        os.unlink(f.name)
+    def sample_file(self, tmp_path, sample_bytes):
+        """Create a file with sample content."""
+        path = tmp_path / "sample.txt"
+        path.write_bytes(sample_bytes)
+        return str(path)
     
     @pytest.fixture
-    def empty_file(self):
-        """Create an empty temporary file."""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
-            yield f.name
-        # Cleanup
-        os.unlink(f.name)
+    def empty_file(self, tmp_path):
+        """Create an empty file."""
+        path = tmp_path / "empty.txt"
+        path.touch()
+        return str(path)
     
     @pytest.fixture
-    def large_file(self):
+    def large_file(self, tmp_path):
         """Create a large file with many lines."""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
-            for i in range(300):
-                f.write(f"Line {i+1}: This is line number {i+1}\n")
-            f.flush()
-            yield f.name
-        # Cleanup
-        os.unlink(f.name)
+        path = tmp_path / "large.txt"
+        path.write_bytes(LARGE_SAMPLE_BYTES)
+        return str(path)
     
     def test_read_entire_file_default(self, sample_file):
         """Test reading entire file with default parameters."""
         content, success = read_file(sample_file)
         
         assert success is True
-        assert "1: Line 1: First line" in content
-        assert "5: Line 5: Fifth line" in content
-        assert content.count('\n') == 5  # Should have line numbers
+        # One numbered line per file line, each still newline-terminated
+        lines = content.splitlines()
+        assert len(lines) == 5
+        assert lines[0] == "1: Line 1: First line"
+        assert lines[4] == "5: Line 5: Fifth line"
+        assert content.endswith("\n")
     
     def test_read_entire_file_explicit(self, sample_file):
         """Test reading entire file with explicit parameter."""
@@ -127,10 +137,12 @@ Line 5: Fifth line
         content, success = read_file(sample_file, 3, 10)
         
         assert success is True
-        assert "3: Line 3: Third line" in content
-        assert "4: Line 4: Fourth line" in content
-        assert "5: Line 5: Fifth line" in content
-        assert content.count('\n') == 3  # Lines 3, 4, 5
+        assert content.splitlines() == [
+            "3: Line 3: Third line",
+            "4: Line 4: Fourth line",
+            "5: Line 5: Fifth line",
+        ]
+        assert content.endswith("\n")
     
     def test_read_lines_at_file_boundary(self, sample_file):
         """Test reading lines at the exact file boundary."""
@@ -156,54 +168,40 @@ Line 5: Fifth line
         assert "1: Line 1: First line" in content  # Should read entire file
         assert "5: Line 5: Fifth line" in content
     
-    def test_unicode_content(self):
+    def test_unicode_content(self, tmp_path):
         """Test reading file with unicode content."""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt', encoding='utf-8') as f:
-            unicode_content = "Line 1: Hello 世界\nLine 2: Café ñiño\nLine 3: 🚀 emoji"
-            f.write(unicode_content)
-            f.flush()
-            
-            try:
-                content, success = read_file(f.name)
-                
-                assert success is True
-                assert "世界" in content
-                assert "Café ñiño" in content
-                assert "🚀 emoji" in content
-                assert "1: Line 1: Hello 世界" in content
-            finally:
-                os.unlink(f.name)
-    
-    def test_file_with_no_newline_at_end(self):
+        path = tmp_path / "unicode.txt"
+        path.write_text("Line 1: Hello 世界\nLine 2: Café ñiño\nLine 3: 🚀 emoji", encoding='utf-8')
+        
+        content, success = read_file(str(path))
+        
+        assert success is True
+        assert "世界" in content
+        assert "Café ñiño" in content
+        assert "🚀 emoji" in content
+        assert "1: Line 1: Hello 世界" in content
+    
+    def test_file_with_no_newline_at_end(self, tmp_path):
         """Test reading file that doesn't end with newline."""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
-            f.write("Line without newline")
-            f.flush()
-            
-            try:
-                content, success = read_file(f.name)
-                
-                assert success is True
-                assert content == "1: Line without newline"
-            finally:
-                os.unlink(f.name)
-    
-    def test_relative_path(self, sample_file):
+        path = tmp_path / "no_newline.txt"
+        path.write_text("Line without newline")
+        
+        content, success = read_file(str(path))
+        
+        assert success is True
+        assert content == "1: Line without newline"
+    
+    def test_relative_path(self, sample_file, tmp_path, monkeypatch):
         """Test reading with relative path."""
-        # Create a symlink in current directory for testing
-        relative_name = "test_relative_file.txt"
-        if os.path.exists(relative_name):
-            os.unlink(relative_name)
+        # Create a symlink in an isolated working directory
+        monkeypatch.chdir(tmp_path)
+        relative_name = "rel.txt"
+        os.symlink(sample_file, relative_name)
         
-        try:
-            os.symlink(sample_file, relative_name)
-            content, success = read_file(relative_name)
-            
-            assert success is True
-            assert "1: Line 1: First line" in content
-        finally:
-            if os.path.exists(relative_name):
-                os.unlink(relative_name)
+        content, success = read_file(relative_name)
+        
+        assert success is True
+        assert "1: Line 1: First line" in content
     
     def test_absolute_path(self, sample_file):
         """Test reading with absolute path."""
@@ -224,24 +222,95 @@ Line 5: Fifth line
         assert lines[1].startswith("3: ")
         assert lines[2].startswith("4: ")
     
-    def test_error_handling_permission_denied(self):
+    @pytest.mark.skipif(not _READ_PERMISSION_ENFORCED, reason="chmod does not deny reads on this platform")
+    def test_error_handling_permission_denied(self, tmp_path):
         """Test handling of permission denied errors."""
-        # This test might not work on all systems
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
-            f.write("test content")
-            f.flush()
+        path = tmp_path / "unreadable.txt"
+        path.write_text("test content")
+        
+        # Remove read permissions
+        os.chmod(path, 0o000)
+        try:
+            content, success = read_file(str(path))
             
-            try:
-                # Remove read permissions
-                os.chmod(f.name, 0o000)
-                content, success = read_file(f.name)
-                
-                assert success is False
-                assert "Error reading file" in content
-            except OSError:
-                # If we can't change permissions, skip this test
-                pytest.skip("Cannot test permission denied on this system")
-            finally:
-                # Restore permissions for cleanup
-                os.chmod(f.name, 0o644)
-                os.unlink(f.name)
\ No newline at end of file
+            assert success is False
+            assert "Error reading file" in content
+        finally:
+            # Restore permissions for cleanup
+            os.chmod(path, 0o644)
+
+
+class TestReadFileCache:
+    """Test that read_file reuses cached lines only while the file is unchanged."""
+    
+    @pytest.fixture
+    def sample_file(self, tmp_path):
+        """Create a file with sample content."""
+        path = tmp_path / "cached.txt"
+        path.write_text("Line 1\nLine 2\nLine 3\n")
+        return str(path)
+    
+    def test_repeated_read_uses_cache(self, sample_file, monkeypatch):
+        """Test that an unchanged file is only opened once."""
+        read_file(sample_file)
+        
+        def fail_open(*args, **kwargs):
+            raise AssertionError("file was re-read")
+        
+        monkeypatch.setattr("builtins.open", fail_open)
+        content, success = read_file(sample_file, 2, 3)
+        
+        assert success is True
+        assert content == "2: Line 2\n3: Line 3\n"
+    
+    def test_repeated_range_reads_match(self, sample_file):
+        """Test that a cached range read returns exactly what the first read did."""
+        first = read_file(sample_file, 2, 3)
+        second = read_file(sample_file, 2, 3)
+        
+        assert second == first == ("2: Line 2\n3: Line 3\n", True)
+    
+    def test_deleted_file_is_not_served_from_cache(self, sample_file):
+        """Test that a cached file removed from disk is reported as missing."""
+        read_file(sample_file)
+        
+        os.unlink(sample_file)
+        content, success = read_file(sample_file)
+        
+        assert success is False
+        assert "does not exist" in content
+    
+    def test_external_modification_is_detected(self, sample_file):
+        """Test that a change in size or mtime invalidates the cached lines."""
+        read_file(sample_file)
+        
+        Path(sample_file).write_text("Changed\n")
+        content, success = read_file(sample_file)
+        
+        assert success is True
+        assert content == "1: Changed\n"
+    
+    def test_same_size_rewrite_by_utility_is_detected(self, sample_file):
+        """Test that edits made through the file utilities never return stale content."""
+        read_file(sample_file)
+        
+        # Same length as "Line 2\n", possibly within the same mtime tick
+        replace_file(sample_file, 2, 2, "Edit 2\n")
+        content, success = read_file(sample_file, 2, 2)
+        
+        assert success is True
+        assert content == "2: Edit 2\n"
+    
+    def test_cache_is_bounded(self, tmp_path, monkeypatch):
+        """Test that the least recently used file is evicted when the cache is full."""
+        monkeypatch.setattr(read_file_module, "MAX_CACHED_FILES", 2)
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"file_{i}.txt"
+            path.write_text(f"File {i}\n")
+            paths.append(str(path))
+            read_file(paths[-1])
+        
+        cached = read_file_module._line_cache
+        assert os.path.abspath(paths[0]) not in cached
+        assert os.path.abspath(paths[2]) in cached
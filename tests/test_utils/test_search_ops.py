@@ -2,23 +2,31 @@
 
 import pytest
 import os
+import re
 import tempfile
-import shutil
 from pathlib import Path
-from src.utils.search_ops import grep_search, _glob_to_regex
+from src.utils.search_ops import grep_search, _compile_pattern, _glob_to_regex, _glob_to_union_regex
 
 
-class TestGrepSearch:
-    """Test the grep_search function with various scenarios."""
+# (glob, names it must match, names it must not match), built once at import
+SINGLE_GLOB_CASES = [
+    pytest.param("*.py", ["test.py", "main.py"], ["test.txt"], id="star_extension"),
+    pytest.param("test?.py", ["test1.py", "testA.py"], ["test12.py", "test.py"], id="question_mark"),
+    # The dot must be literal
+    pytest.param("test.py", ["test.py"], ["testXpy"], id="dot_escaping"),
+    # .sh and .cpp have more than one character after the dot
+    pytest.param("test_*.?", ["test_file.c"], ["test_script.sh", "test_file.cpp", "file.c"], id="complex"),
+]
+
+
+@pytest.fixture(scope="module")
+def test_directory(tmp_path_factory):
+    """Create a temporary directory with test files once per module. Do not modify it."""
+    temp_dir = tmp_path_factory.mktemp("grep_fixture")
     
-    @pytest.fixture
-    def test_directory(self):
-        """Create a temporary directory with test files."""
-        temp_dir = tempfile.mkdtemp()
-        
-        # Create test files with different content
-        files_content = {
-            "test.py": """def hello_world():
+    # Create test files with different content
+    files_content = {
+        "test.py": """def hello_world():
     print("Hello, World!")
     return "hello"
 
@@ -26,7 +34,7 @@ class TestClass:
     def __init__(self):
         self.value = 42
 """,
-            "main.py": """import os
+        "main.py": """import os
 def main():
     print("Main function")
     hello_world()
@@ -34,16 +42,16 @@ def main():
 if __name__ == "__main__":
     main()
 """,
-            "config.yaml": """app:
+        "config.yaml": """app:
   name: TestApp
   version: 1.0.0
   debug: true
 """,
-            "README.md": """# Test Project
+        "README.md": """# Test Project
 This is a test project for searching.
 Contains various files with different content.
 """,
-            "script.js": """function greet() {
+        "script.js": """function greet() {
     console.log("Hello from JavaScript!");
 }
 
@@ -52,28 +60,24 @@ const app = {
     version: "1.0.0"
 };
 """,
-        }
-        
-        # Create subdirectory
-        subdir = os.path.join(temp_dir, "subdir")
-        os.makedirs(subdir)
-        
-        # Add file in subdirectory
-        files_content["subdir/helper.py"] = """def helper_function():
+    }
+    
+    # Add file in subdirectory
+    files_content["subdir/helper.py"] = """def helper_function():
     return "helper"
 """
-        
-        # Write all files
-        for filepath, content in files_content.items():
-            full_path = os.path.join(temp_dir, filepath)
-            os.makedirs(os.path.dirname(full_path), exist_ok=True)
-            with open(full_path, 'w') as f:
-                f.write(content)
-        
-        yield temp_dir
-        
-        # Cleanup
-        shutil.rmtree(temp_dir)
+    
+    # Write all files, creating subdirectories as they are needed
+    for filepath, content in files_content.items():
+        full_path = temp_dir / filepath
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        full_path.write_text(content)
+    
+    return str(temp_dir)
+
+
+class TestGrepSearch:
+    """Test the grep_search function with various scenarios."""
     
     def test_basic_search(self, test_directory):
         """Test basic text search."""
@@ -172,15 +176,15 @@ const app = {
             assert isinstance(result["line_number"], int)
             assert result["line_number"] > 0
     
-    def test_result_limit(self, test_directory):
+    def test_result_limit(self, tmp_path):
         """Test that results are limited to 50."""
         # Create many files to exceed limit
         for i in range(60):
-            filename = os.path.join(test_directory, f"file_{i}.txt")
+            filename = os.path.join(tmp_path, f"file_{i}.txt")
             with open(filename, 'w') as f:
                 f.write("test_pattern_to_find\n")
         
-        results, success = grep_search("test_pattern_to_find", working_dir=test_directory)
+        results, success = grep_search("test_pattern_to_find", working_dir=str(tmp_path))
         
         assert success is True
         assert len(results) <= 50
@@ -203,17 +207,63 @@ const app = {
         finally:
             os.chdir(original_cwd)
     
-    def test_binary_file_handling(self, test_directory):
+    def test_binary_file_handling(self, tmp_path):
         """Test handling of binary files."""
         # Create a binary file
-        binary_file = os.path.join(test_directory, "binary.bin")
+        binary_file = os.path.join(tmp_path, "binary.bin")
         with open(binary_file, 'wb') as f:
             f.write(b'\x00\x01\x02\x03\xff\xfe\xfd')
         
         # Should not crash on binary files
-        results, success = grep_search("def", working_dir=test_directory)
+        results, success = grep_search("def", working_dir=str(tmp_path))
         assert success is True
     
+    def test_binary_file_is_skipped(self, tmp_path):
+        """Test that files with NUL bytes are not searched."""
+        (tmp_path / "text.txt").write_bytes(b"needle\n")
+        (tmp_path / "data.bin").write_bytes(b"\x00\x01needle\n")
+        
+        results, success = grep_search("needle", working_dir=str(tmp_path))
+        
+        assert success is True
+        assert [r["file"] for r in results] == [str(tmp_path / "text.txt")]
+    
+    def test_large_file_is_streamed(self, tmp_path, monkeypatch):
+        """Test that files over the in-memory threshold are streamed with the same line numbers."""
+        monkeypatch.setattr("src.utils.search_ops._MAX_IN_MEMORY_CHARS", 16)
+        (tmp_path / "big.txt").write_text("first line\nsecond needle line\nthird\nneedle\n")
+        
+        results, success = grep_search("needle", working_dir=str(tmp_path))
+        
+        assert success is True
+        assert [(r["line_number"], r["content"]) for r in results] == [(2, "second needle line"), (4, "needle")]
+    
+    def test_plain_text_query_matches_regex_query(self, test_directory):
+        """Test that the plain-text fast path finds the same lines as a regex."""
+        plain, plain_success = grep_search("hello_world", working_dir=test_directory)
+        regex, regex_success = grep_search("hello_worl[d]", working_dir=test_directory)
+        
+        assert plain_success is True and regex_success is True
+        assert len(plain) == 2  # definition in test.py, call in main.py
+        assert sorted(plain, key=lambda r: r["file"]) == sorted(regex, key=lambda r: r["file"])
+    
+    def test_query_pattern_is_cached(self):
+        """Test that a query is compiled once per case sensitivity."""
+        assert _compile_pattern("def", True) is _compile_pattern("def", True)
+        assert _compile_pattern("def", False).flags & re.IGNORECASE
+    
+    def test_symlinked_directory_not_followed(self, tmp_path):
+        """Test that symlinked directories are not searched, like os.walk."""
+        real_dir = tmp_path / "real"
+        real_dir.mkdir()
+        (real_dir / "found.py").write_text("needle\n")
+        (tmp_path / "link").symlink_to(real_dir, target_is_directory=True)
+        
+        results, success = grep_search("needle", working_dir=str(tmp_path))
+        
+        assert success is True
+        assert [r["file"] for r in results] == [str(real_dir / "found.py")]
+    
     def test_empty_directory(self):
         """Test search in empty directory."""
         with tempfile.TemporaryDirectory() as empty_dir:
@@ -234,14 +284,14 @@ const app = {
 class TestGlobToRegex:
     """Test the _glob_to_regex helper function."""
     
-    def test_single_glob_pattern(self):
-        """Test converting single glob pattern."""
-        patterns = _glob_to_regex("*.py")
+    @pytest.mark.parametrize("glob,positives,negatives", SINGLE_GLOB_CASES)
+    def test_single_glob_matching(self, glob, positives, negatives):
+        """Test that a single glob becomes one regex matching only the expected names."""
+        patterns = _glob_to_regex(glob)
         
         assert len(patterns) == 1
-        assert patterns[0].match("test.py")
-        assert patterns[0].match("main.py")
-        assert not patterns[0].match("test.txt")
+        assert [name for name in positives if not patterns[0].match(name)] == []
+        assert [name for name in negatives if patterns[0].match(name)] == []
     
     def test_multiple_glob_patterns(self):
         """Test converting multiple glob patterns."""
@@ -255,16 +305,6 @@ class TestGlobToRegex:
         assert any("js" in p for p in pattern_strings)
         assert any("ts" in p for p in pattern_strings)
     
-    def test_question_mark_glob(self):
-        """Test question mark glob pattern."""
-        patterns = _glob_to_regex("test?.py")
-        
-        assert len(patterns) == 1
-        assert patterns[0].match("test1.py")
-        assert patterns[0].match("testA.py")
-        assert not patterns[0].match("test12.py")
-        assert not patterns[0].match("test.py")
-    
     def test_empty_patterns(self):
         """Test handling of empty patterns."""
         patterns = _glob_to_regex("")
@@ -281,14 +321,6 @@ class TestGlobToRegex:
         assert any(p.match("test.py") for p in patterns)
         assert any(p.match("test.js") for p in patterns)
     
-    def test_dot_escaping(self):
-        """Test that dots are properly escaped."""
-        patterns = _glob_to_regex("test.py")
-        
-        assert len(patterns) == 1
-        assert patterns[0].match("test.py")
-        assert not patterns[0].match("testXpy")  # Dot should be literal
-    
     def test_invalid_regex_patterns(self):
         """Test handling of patterns that create invalid regex."""
         # This should not crash
@@ -296,12 +328,17 @@ class TestGlobToRegex:
         # Invalid patterns should be skipped
         assert len(patterns) == 0
     
-    def test_complex_glob_patterns(self):
-        """Test complex glob patterns."""
-        patterns = _glob_to_regex("test_*.?")
+    def test_union_regex_matches_like_any_pattern(self):
+        """Test that the combined regex accepts exactly the names some single glob accepts."""
+        globs = " *.py , *.js ,test?.txt"
+        union = _glob_to_union_regex(globs)
+        patterns = _glob_to_regex(globs)
         
-        assert len(patterns) == 1
-        assert patterns[0].match("test_file.c")
-        assert not patterns[0].match("test_script.sh")  # .sh has 2 chars after dot, pattern expects 1
-        assert not patterns[0].match("test_file.cpp")
-        assert not patterns[0].match("file.c")
\ No newline at end of file
+        for name in ["a.py", "b.js", "test1.txt", "a.txt", "test12.txt", "a.pyc"]:
+            assert bool(union.match(name)) == any(p.match(name) for p in patterns), name
+        assert _glob_to_union_regex(",,,") is None
+    
+    def test_patterns_are_cached(self):
+        """Test that repeated pattern strings reuse the compiled patterns."""
+        assert _glob_to_regex("*.py") is _glob_to_regex("*.py")
+        assert isinstance(_glob_to_regex("*.py,*.js"), tuple)
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""Tests for the _validate_operations helper."""
+
+import pytest
+from src.flow import _validate_operations
+
+
+def _op(start_line, end_line):
+    return {"start_line": start_line, "end_line": end_line, "replacement": "x\n"}
+
+
+class TestValidateOperations:
+    """Test checking planned edit operations against the file."""
+    
+    def test_valid_operations(self):
+        """Test that ordered, in-range, disjoint operations are accepted in any order."""
+        _validate_operations([_op(5, 6), _op(1, 1), _op(2, 4)], total_lines=6)
+    
+    def test_overlapping_operations_are_not_checked(self):
+        """Test that ranges are checked one at a time, so overlapping operations are accepted."""
+        _validate_operations([_op(1, 3), _op(3, 4), _op(2, 2)], total_lines=6)
+    
+    @pytest.mark.parametrize(
+        "operations,message",
+        [
+            pytest.param([_op(3, 2)], "start_line > end_line: 3 > 2", id="start_after_end"),
+            pytest.param([_op(2, 7)], "end_line out of range: 7", id="end_past_total_lines"),
+            pytest.param([_op(0, 2)], "start_line out of range: 0", id="start_below_one"),
+            pytest.param([{"start_line": 1, "end_line": 1}], "replacement is missing", id="missing_replacement"),
+        ],
+    )
+    def test_invalid_operations(self, operations, message):
+        """Test that each kind of invalid operation raises an AssertionError naming the problem."""
+        with pytest.raises(AssertionError) as excinfo:
+            _validate_operations(operations, total_lines=6)
+        
+        assert str(excinfo.value) == message